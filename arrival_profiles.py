@@ -0,0 +1,99 @@
+# arrival_profiles.py
+#
+# Time-varying arrival rates for the bank model and bulk non-homogeneous Poisson (NHPP)
+# arrival generation. A profile is a list of (minute, customers per hour) knots read as
+#   "step"   - piecewise constant: each rate holds until the next knot
+#   "linear" - straight lines between knots
+#   "spline" - shape-preserving cubic (PCHIP), so the rate never overshoots or goes negative
+# All arrivals for a run are generated up front as one sorted NumPy array:
+#   inversion - unit-rate Poisson points mapped through the inverse cumulative rate
+#   thinning  - homogeneous points at the peak rate, each kept with probability rate(t) / peak
+import math
+
+import numpy as np
+from scipy.interpolate import PchipInterpolator
+
+GRID_MINUTES = 0.25   # resolution of the cumulative rate for the linear and spline shapes
+
+
+class ArrivalProfile:
+    """
+    Arrival rate as a function of time (minutes since opening). `rates_per_hour` apply
+    from the matching `minutes` knot; the last rate holds until the end of the run.
+    """
+
+    def __init__(self, minutes, rates_per_hour, shape="step"):
+        self.minutes = np.asarray(minutes, dtype=float)
+        self.rates = np.asarray(rates_per_hour, dtype=float) / 60.0   # customers per minute
+        if self.minutes.size == 0 or self.minutes[0] != 0 or np.any(np.diff(self.minutes) <= 0):
+            raise ValueError("Profile minutes must start at 0 and increase")
+        if np.any(self.rates < 0):
+            raise ValueError("Arrival rates must be non-negative")
+        if shape not in ("step", "linear", "spline"):
+            raise ValueError(f"Unknown profile shape: {shape!r}")
+        self.shape = shape
+        self._spline = None
+        if shape == "spline" and self.minutes.size > 1:
+            self._spline = PchipInterpolator(self.minutes, self.rates)
+
+    def rate(self, t):
+        """Arrival rate (customers per minute) at time(s) t."""
+        t = np.asarray(t, dtype=float)
+        if self.shape == "step" or self.minutes.size == 1:
+            return self.rates[np.searchsorted(self.minutes, t, side="right") - 1]
+        if self.shape == "linear":
+            return np.interp(t, self.minutes, self.rates)
+        return np.clip(self._spline(np.minimum(t, self.minutes[-1])), 0.0, None)
+
+    def cumulative(self, sim_time):
+        """
+        Knots (times, expected arrivals by that time) of the cumulative rate on [0, sim_time];
+        exact for "step", trapezoidal on a GRID_MINUTES grid otherwise.
+        """
+        if self.shape == "step" or self.minutes.size == 1:
+            times = np.append(self.minutes[self.minutes < sim_time], sim_time)
+            widths = np.diff(times)
+            return times, np.concatenate([[0.0], np.cumsum(self.rates[:widths.size] * widths)])
+        times = np.union1d(np.linspace(0.0, sim_time, int(math.ceil(sim_time / GRID_MINUTES)) + 1),
+                           self.minutes[self.minutes < sim_time])
+        rates = self.rate(times)
+        return times, np.concatenate([[0.0], np.cumsum(np.diff(times) * (rates[1:] + rates[:-1]) / 2)])
+
+    def expected_arrivals(self, start, end):
+        times, expected = self.cumulative(end)
+        return float(expected[-1] - np.interp(start, times, expected))
+
+
+def load_arrival_profile(path, shape="step"):
+    """Reads a CSV with columns "minute,arrivals_per_hour"."""
+    table = np.genfromtxt(path, delimiter=",", names=True)
+    return ArrivalProfile(np.atleast_1d(table["minute"]), np.atleast_1d(table["arrivals_per_hour"]), shape)
+
+
+def nhpp_arrivals(profile, sim_time, rng, method="inversion"):
+    """
+    Sorted NHPP arrival times on [0, sim_time) for an ArrivalProfile.
+
+    Returns:
+      float array of arrival times
+    """
+    if method == "inversion":
+        times, expected = profile.cumulative(sim_time)
+        total = expected[-1]
+        if total <= 0:
+            return np.empty(0)
+        # Given the count, unit-rate points on [0, total] are sorted uniforms
+        unit = np.sort(rng.uniform(0.0, total, rng.poisson(total)))
+        # Invert segment by segment; searchsorted skips flat (zero-rate) stretches
+        upper = np.clip(np.searchsorted(expected, unit, side="right"), 1, expected.size - 1)
+        lower = upper - 1
+        fraction = (unit - expected[lower]) / (expected[upper] - expected[lower])
+        return times[lower] + fraction * (times[upper] - times[lower])
+    if method == "thinning":
+        times, _ = profile.cumulative(sim_time)
+        peak = float(profile.rate(times).max())
+        if peak <= 0:
+            return np.empty(0)
+        candidates = np.sort(rng.uniform(0.0, sim_time, rng.poisson(peak * sim_time)))
+        return candidates[rng.uniform(0.0, peak, candidates.size) < profile.rate(candidates)]
+    raise ValueError(f"Unknown NHPP method: {method!r}")
@@ -0,0 +1,14 @@
+# backend/ai_consumer/__main__.py
+#
+#   cd backend && python -m ai_consumer
+#
+# Spawned worker processes never re-run a package's __main__, so starting the consumer
+# from here keeps the CPU pool workers down to their handlers and warm-ups.
+import asyncio
+
+from ai_consumer.main import logger, main
+
+try:
+    asyncio.run(main())
+except KeyboardInterrupt:
+    logger.info("Consumer stopped manually.")
@@ -0,0 +1,70 @@
+# backend/ai_consumer/batching.py
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class MicroBatcher:
+    """
+    Collects keys submitted by concurrent callers and hands them to `handler` together,
+    once `max_size` keys are waiting or `max_wait_ms` after the first one arrived,
+    whichever comes first. Each caller gets its own key's result (or exception) back,
+    so messages can still be acked or nacked one by one.
+    """
+
+    def __init__(self, handler: BatchHandler, max_size: int = 32, max_wait_ms: float = 50):
+        self.handler = handler
+        self.max_size = max_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[Hashable, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task] = set()
+
+    async def submit(self, key: Hashable) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((key, future))
+        if len(self._pending) >= self.max_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._dispatch)
+        return await future
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Hashable, asyncio.Future]]):
+        keys = list(dict.fromkeys(key for key, _ in batch))  # duplicates share one slot
+        try:
+            results = await self.handler(keys)
+        except Exception as e:
+            logger.error(f"Batch of {len(keys)} failed: {e}", exc_info=True)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch:
+            if future.done():
+                continue  # caller was cancelled
+            if key in results:
+                future.set_result(results[key])
+            else:
+                future.set_exception(KeyError(f"No result for {key!r} in batch"))
+
+    async def flush(self):
+        """Sends whatever is waiting now and waits for every running batch to finish."""
+        self._dispatch()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
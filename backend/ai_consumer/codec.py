@@ -0,0 +1,119 @@
+# backend/ai_consumer/codec.py
+#
+# Message body codec for AI tasks. A body is either one task object or a batch
+# envelope {"tasks": [task, ...]} carrying many tasks in one broker message, encoded as
+#   application/json     - orjson when installed, else the standard json module
+#   application/msgpack  - msgpack (optional dependency)
+# chosen by the message's content_type (JSON when missing). Task schemas are pydantic
+# TypeAdapters built once at import, keyed by task type.
+import json
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+
+from pydantic import TypeAdapter, ValidationError
+from typing_extensions import NotRequired, TypedDict  # pydantic needs this TypedDict before 3.12
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional format
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+
+class TaskDecodeError(ValueError):
+    """The body can never be processed (bad encoding, unsupported type or schema)."""
+
+
+class ReanalyzeResumeTask(TypedDict):
+    type: Literal["reanalyze_resume"]
+    resume_id: str
+    content_version: NotRequired[Union[int, str]]
+
+
+class GenericTask(TypedDict):
+    type: str
+
+
+TASK_SCHEMAS: Dict[str, TypeAdapter] = {
+    "reanalyze_resume": TypeAdapter(ReanalyzeResumeTask),
+}
+_GENERIC = TypeAdapter(GenericTask)
+
+
+def _json_loads(body: bytes):
+    return orjson.loads(body) if orjson else json.loads(body)
+
+
+def _json_dumps(value) -> bytes:
+    return orjson.dumps(value) if orjson else json.dumps(value, separators=(",", ":")).encode()
+
+
+def supported_content_types() -> List[str]:
+    return [JSON] + ([MSGPACK] if msgpack else [])
+
+
+def _loads(body: bytes, content_type: Optional[str]):
+    content_type = (content_type or JSON).split(";")[0].strip().lower()
+    if content_type in (JSON, "text/json"):
+        return _json_loads(body)
+    if content_type in (MSGPACK, "application/x-msgpack") and msgpack:
+        return msgpack.unpackb(body, raw=False)
+    raise TaskDecodeError(f"Unsupported content type {content_type!r}; accepted: {supported_content_types()}")
+
+
+def validate_task(task: Any) -> Dict[str, Any]:
+    """Checks a task against its type's schema; unknown types only need a "type" string."""
+    if not isinstance(task, dict):
+        raise TaskDecodeError(f"Task must be an object, got {type(task).__name__}")
+    adapter = TASK_SCHEMAS.get(task.get("type"), _GENERIC)
+    try:
+        adapter.validate_python(task)
+    except ValidationError as e:
+        raise TaskDecodeError(f"Invalid {task.get('type')!r} task: {e.errors(include_url=False)}") from e
+    return task
+
+
+def decode_tasks(body: bytes, content_type: Optional[str] = None
+                 ) -> Tuple[List[Dict[str, Any]], List[Tuple[Any, TaskDecodeError]]]:
+    """
+    Returns (valid tasks, [(invalid task, error), ...]) for a message body (one task, or
+    all of a batch envelope). Each task is validated on its own, so one bad task does
+    not sink the rest of its envelope. Raises TaskDecodeError when the body itself is
+    unusable (bad encoding, unsupported content type, malformed envelope).
+    """
+    try:
+        payload = _loads(body, content_type)
+    except TaskDecodeError:
+        raise
+    except Exception as e:
+        raise TaskDecodeError(f"Undecodable body: {e}") from e
+    if isinstance(payload, dict) and "tasks" in payload and "type" not in payload:
+        if not isinstance(payload["tasks"], list):
+            raise TaskDecodeError("Batch envelope 'tasks' must be a list")
+        items = payload["tasks"]
+    else:
+        items = [payload]
+    valid, invalid = [], []
+    for task in items:
+        try:
+            valid.append(validate_task(task))
+        except TaskDecodeError as e:
+            invalid.append((task, e))
+    return valid, invalid
+
+
+def encode_tasks(tasks: List[Dict[str, Any]], content_type: str = JSON) -> bytes:
+    """Encodes one task as a plain object and several as a batch envelope."""
+    payload = tasks[0] if len(tasks) == 1 else {"tasks": tasks}
+    content_type = (content_type or JSON).split(";")[0].strip().lower()
+    if content_type in (MSGPACK, "application/x-msgpack"):
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed")
+        return msgpack.packb(payload, use_bin_type=True)
+    return _json_dumps(payload)
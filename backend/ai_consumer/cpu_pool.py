@@ -0,0 +1,99 @@
+# backend/ai_consumer/cpu_pool.py
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# name -> top-level function; functions are pickled by reference, so only the
+# arguments and the result cross the process boundary
+CPU_HANDLERS: Dict[str, Callable] = {}
+WORKER_WARMUPS: List[Callable[[], Any]] = []
+
+
+def cpu_handler(name: str, warmup: Optional[Callable[[], Any]] = None):
+    """
+    Registers a CPU-bound function to run in the worker processes. `warmup` (e.g. a
+    model loader) runs once in every worker when the pool starts.
+    """
+    def register(func):
+        CPU_HANDLERS[name] = func
+        if warmup is not None and warmup not in WORKER_WARMUPS:
+            WORKER_WARMUPS.append(warmup)
+        return func
+    return register
+
+
+def _warm_worker(warmups):
+    for warmup in warmups:
+        warmup()
+
+
+def _ping():
+    return os.getpid()
+
+
+class CpuPool:
+    """
+    Warm ProcessPoolExecutor for registered CPU handlers, so heavy scoring never blocks
+    the event loop (and the AMQP heartbeats running on it).
+
+    A call that exceeds `timeout` seconds raises asyncio.TimeoutError and a crashed
+    worker raises BrokenProcessPool. Either way the pool is rebuilt for the next call
+    (after a timeout its workers are killed, since a started job cannot be cancelled)
+    and the caller's message fails and goes through the normal retry path; other calls
+    running in the old pool fail with BrokenProcessPool and are retried the same way.
+    """
+
+    def __init__(self, workers: Optional[int] = None, timeout: float = 30.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _create(self):
+        # spawn: forking a process that already runs an event loop and driver threads is unsafe
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_warm_worker, initargs=(list(WORKER_WARMUPS),))
+
+    async def start(self):
+        """Starts every worker and waits until each has run its warm-ups."""
+        self._create()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _ping) for _ in range(self.workers)))
+        logger.info(f"CPU pool ready: {self.workers} warm worker(s)")
+
+    async def run(self, name: str, *args) -> Any:
+        if self._pool is None:
+            self._create()
+        pool = self._pool
+        try:
+            return await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(pool, CPU_HANDLERS[name], *args),
+                                          self.timeout)
+        except BrokenProcessPool:
+            logger.error(f"CPU worker crashed while running {name}; restarting the pool")
+            self._restart(pool)
+            raise
+        except asyncio.TimeoutError:
+            logger.error(f"CPU handler {name} timed out after {self.timeout:g} s; restarting the pool")
+            self._restart(pool, terminate=True)
+            raise
+
+    def _restart(self, pool: ProcessPoolExecutor, terminate: bool = False):
+        if self._pool is not pool:
+            return  # another failed call already replaced it
+        processes = list((pool._processes or {}).values())  # no public accessor before Python 3.14
+        pool.shutdown(wait=False, cancel_futures=True)
+        if terminate:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+        self._create()
+
+    def shutdown(self, wait: bool = True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
@@ -7,14 +7,20 @@ DB_NAME = "ai_consumer"
 client: AsyncIOMotorClient | None = None
 db = None
 
-async def connect_db():
+async def connect_db() -> bool:
+    """Returns True if this call created the client, i.e. the caller should disconnect it."""
     global client, db
+    if client is not None:
+        return False  # already connected (API and embedded consumer share one client)
     client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI)
     db = client[DB_NAME]
     print("✅ Connected to MongoDB")
+    return True
 
 async def disconnect_db():
-    global client
+    global client, db
     if client:
         client.close()
+        client = None
+        db = None
         print("🔌 Disconnected from MongoDB")
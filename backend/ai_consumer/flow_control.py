@@ -0,0 +1,64 @@
+# backend/ai_consumer/flow_control.py
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that adapts to downstream health (additive increase,
+    multiplicative decrease). After every `window` completed tasks:
+      - smoothed latency above `target_latency` or error rate above `max_error_rate`
+        -> limit *= `decrease`
+      - otherwise -> limit += 1
+    bounded by [min_limit, max_limit]. `on_change(limit)` runs after each change, e.g.
+    to lower the channel prefetch so the broker stops pushing messages we can't start.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, target_latency: float = 5.0,
+                 max_error_rate: float = 0.2, window: int = 20, decrease: float = 0.7,
+                 on_change: Optional[Callable[[int], Awaitable[None]]] = None):
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.limit = max_limit
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self.window = window
+        self.decrease = decrease
+        self.on_change = on_change
+        self.in_flight = 0
+        self.latency = 0.0  # exponentially weighted, seconds
+        self._samples = 0
+        self._completed = 0
+        self._errors = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self, latency: float, ok: bool):
+        self.latency = latency if self._samples == 0 else self.latency + 0.1 * (latency - self.latency)
+        self._samples += 1
+        self._completed += 1
+        self._errors += not ok
+        changed = False
+        if self._completed >= self.window:
+            error_rate = self._errors / self._completed
+            if self.latency > self.target_latency or error_rate > self.max_error_rate:
+                new_limit = max(self.min_limit, int(self.limit * self.decrease))
+            else:
+                new_limit = min(self.max_limit, self.limit + 1)
+            if new_limit != self.limit:
+                logger.info(f"Concurrency limit {self.limit} -> {new_limit} "
+                            f"(latency {self.latency:.2f} s, error rate {error_rate:.0%})")
+                self.limit, changed = new_limit, True
+            self._completed = self._errors = 0
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+        if changed and self.on_change is not None:
+            await self.on_change(self.limit)
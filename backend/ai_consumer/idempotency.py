@@ -0,0 +1,143 @@
+# backend/ai_consumer/idempotency.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ai_consumer import db as mongo
+from ai_consumer.metrics import DB_CALL_TIME
+
+logger = logging.getLogger(__name__)
+
+PROCESSED_COLLECTION = "processed_tasks"
+
+
+def task_key(task: Dict[str, Any]) -> Optional[str]:
+    """
+    Idempotency key (task type, resume_id, content version), or None when the task
+    carries no content version: the resume may have been edited since the last run,
+    so such tasks are always recomputed (the fraud score cache still skips the model
+    for unchanged content).
+    """
+    task_type, resume_id = task.get("type"), task.get("resume_id")
+    version = task.get("content_version", task.get("version"))
+    if not task_type or not resume_id or version is None:
+        return None
+    return f"{task_type}:{resume_id}:{version}"
+
+
+def inflight_key(task: Dict[str, Any]) -> Optional[str]:
+    """
+    Key for tasks without a content version: copies arriving while one run is still in
+    flight read the same content, so they can share it (see IdempotencyCache.run).
+    """
+    task_type, resume_id = task.get("type"), task.get("resume_id")
+    if not task_type or not resume_id:
+        return None
+    return f"{task_type}:{resume_id}:inflight"
+
+
+class MongoProcessedStore:
+    """
+    Completed task results in the consumer's MongoDB (ai_consumer.db); a TTL index on
+    expires_at lets MongoDB drop old entries on its own.
+    """
+
+    def __init__(self, collection: str = PROCESSED_COLLECTION):
+        self.collection_name = collection
+
+    @property
+    def collection(self):
+        return mongo.db[self.collection_name] if mongo.db is not None else None
+
+    async def ensure_indexes(self):
+        if self.collection is not None:
+            await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def get(self, key: str):
+        if self.collection is None:
+            return None
+        with DB_CALL_TIME.time(operation=f"{self.collection_name}.find_one"):
+            doc = await self.collection.find_one({"_id": key})
+        # The TTL monitor runs about once a minute, so check expiry here too
+        if doc and doc["expires_at"].replace(tzinfo=timezone.utc) > datetime.now(timezone.utc):
+            return doc["result"]
+        return None
+
+    async def put(self, key: str, result: Any, ttl_seconds: float):
+        if self.collection is None:
+            return
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+        with DB_CALL_TIME.time(operation=f"{self.collection_name}.replace_one"):
+            await self.collection.replace_one({"_id": key}, {"_id": key, "result": result, "expires_at": expires_at},
+                                              upsert=True)
+
+
+class IdempotencyCache:
+    """
+    Runs each task key at most once within `ttl_seconds`:
+      - completed keys are answered from a bounded in-memory LRU, then from `store`
+      - duplicates arriving while the first copy is still running await the same future
+    Failures are not cached, so a retried message runs again. With remember=False only
+    the coalescing applies: nothing is read from or written to either cache.
+    """
+
+    def __init__(self, store: Optional[MongoProcessedStore] = None, max_entries: int = 10_000,
+                 ttl_seconds: float = 3600):
+        self.store = store
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._done: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def _lookup(self, key: str):
+        entry = self._done.get(key)
+        if entry is None:
+            return False, None
+        expires, result = entry
+        if expires < time.monotonic():
+            del self._done[key]
+            return False, None
+        self._done.move_to_end(key)
+        return True, result
+
+    def _remember(self, key: str, result: Any):
+        self._done[key] = (time.monotonic() + self.ttl, result)
+        self._done.move_to_end(key)
+        while len(self._done) > self.max_entries:
+            self._done.popitem(last=False)
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[Any]], remember: bool = True) -> Any:
+        found, result = self._lookup(key) if remember else (False, None)
+        if found:
+            logger.info(f"Duplicate task {key} answered from cache")
+            return result
+        if key in self._in_flight:
+            logger.info(f"Duplicate task {key} joined the running one")
+            return await asyncio.shield(self._in_flight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            if not remember:
+                result = await compute()
+            else:
+                result = await self.store.get(key) if self.store else None
+                if result is None:
+                    result = await compute()
+                    if self.store:
+                        await self.store.put(key, result, self.ttl)
+                self._remember(key, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._in_flight[key]
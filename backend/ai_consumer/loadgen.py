@@ -0,0 +1,164 @@
+# backend/ai_consumer/loadgen.py
+#
+# Offline benchmark for the consumer: runs ai_consumer.main.consume() against the
+# in-process broker (transport.InMemoryTransport), publishes a configurable task mix at
+# a fixed rate and reports sustained throughput, end-to-end latency (first publish to
+# final ack, retries included) and peak memory. Rates and latencies are per message;
+# with --tasks-per-message > 1 each message is a batch envelope (see codec.py).
+#
+#   cd backend && python -m ai_consumer.loadgen --rate 200 --duration 30 \
+#       --mix reanalyze_resume=0.95,unknown=0.04,malformed=0.01 --duplicates 0.1 \
+#       --content-type application/msgpack --tasks-per-message 20
+import argparse
+import asyncio
+import random
+import resource
+import statistics
+import time
+from typing import Dict
+
+from ai_consumer import main as consumer
+from ai_consumer.codec import JSON, encode_tasks
+from ai_consumer.transport import InMemoryTransport
+
+SEQ_HEADER = "x-loadgen-seq"
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def make_task(kind: str, n: int, rng: random.Random, duplicate_fraction: float) -> dict:
+    if kind == "reanalyze_resume":
+        resume = rng.randrange(n) if n and rng.random() < duplicate_fraction else n
+        return {"type": "reanalyze_resume", "resume_id": f"resume-{resume}", "content_version": 1}
+    return {"type": kind}
+
+
+def make_body(kinds, weights, first: int, count: int, rng: random.Random, duplicate_fraction: float,
+              content_type: str) -> bytes:
+    """One message of `count` tasks; a "malformed" draw makes the whole body undecodable."""
+    chosen = rng.choices(kinds, weights, k=count)
+    if "malformed" in chosen:
+        return b"{not json"
+    return encode_tasks([make_task(kind, first + i, rng, duplicate_fraction) for i, kind in enumerate(chosen)],
+                        content_type)
+
+
+class LoadStats:
+    """Follows every generated message through retries to its final ack or dead-letter."""
+
+    def __init__(self):
+        self.published_at: Dict[int, float] = {}
+        self.handoffs: Dict[int, int] = {}   # copies republished to a retry or dead-letter queue
+        self.latencies = []
+        self.dead_lettered = 0
+        self.first_publish = None
+        self.last_completion = None
+
+    def on_publish(self, queue: str, message):
+        seq = message.headers.get(SEQ_HEADER)
+        if seq is None:
+            return
+        if queue == consumer.QUEUE_NAME:
+            self.published_at.setdefault(seq, time.perf_counter())
+            self.first_publish = self.first_publish or time.perf_counter()
+            return
+        if queue.endswith(".dead"):
+            self.dead_lettered += 1
+            self._complete(seq)
+        else:
+            self.handoffs[seq] = self.handoffs.get(seq, 0) + 1
+
+    def on_settle(self, message, outcome: str):
+        seq = message.headers.get(SEQ_HEADER)
+        if seq is None or outcome != "ack":
+            return
+        if self.handoffs.get(seq):
+            self.handoffs[seq] -= 1  # this ack hands the message over to its retry copy
+        elif seq in self.published_at:
+            self._complete(seq)
+
+    def _complete(self, seq: int):
+        now = time.perf_counter()
+        self.latencies.append(now - self.published_at.pop(seq))
+        self.handoffs.pop(seq, None)
+        self.last_completion = now
+
+    @property
+    def completed(self) -> int:
+        return len(self.latencies)
+
+
+async def run_load(rate: float, duration: float, mix: Dict[str, float], duplicate_fraction: float = 0.0,
+                   drain_timeout: float = 60.0, seed: int = 42, content_type: str = JSON,
+                   tasks_per_message: int = 1) -> dict:
+    rng = random.Random(seed)
+    stats = LoadStats()
+    transport = InMemoryTransport(on_publish=stats.on_publish, on_settle=stats.on_settle)
+    await consumer.cpu_pool.start()
+    stop = asyncio.Event()
+    consumer_task = asyncio.create_task(consumer.consume(transport, stop))
+
+    kinds, weights = list(mix), list(mix.values())
+    total = int(rate * duration)
+    start = time.perf_counter()
+    for seq in range(total):
+        delay = start + seq / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        body = make_body(kinds, weights, seq * tasks_per_message, tasks_per_message, rng, duplicate_fraction,
+                         content_type)
+        await transport.publish(consumer.QUEUE_NAME, body, {SEQ_HEADER: seq}, content_type)
+    publish_elapsed = time.perf_counter() - start
+
+    deadline = time.perf_counter() + drain_timeout
+    while stats.completed < total and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+
+    stop.set()
+    await asyncio.gather(consumer_task, return_exceptions=True)
+    consumer.cpu_pool.shutdown()
+
+    latencies = sorted(stats.latencies)
+    window = (stats.last_completion - stats.first_publish) if stats.completed else 0.0
+    return {
+        "sent": total,
+        "completed": stats.completed,
+        "dead_lettered": stats.dead_lettered,
+        "offered_rate": total / publish_elapsed if publish_elapsed else 0.0,
+        "throughput": stats.completed / window if window else 0.0,
+        "p50_latency": statistics.median(latencies) if latencies else 0.0,
+        "p99_latency": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] if latencies else 0.0,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the AI task consumer")
+    parser.add_argument("--rate", type=float, default=100.0, help="messages per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of publishing")
+    parser.add_argument("--mix", default="reanalyze_resume=1", help="task types and weights, e.g. "
+                        "reanalyze_resume=0.95,unknown=0.04,malformed=0.01")
+    parser.add_argument("--duplicates", type=float, default=0.0, help="share of resume ids repeated")
+    parser.add_argument("--content-type", default=JSON, help="application/json or application/msgpack")
+    parser.add_argument("--tasks-per-message", type=int, default=1, help="tasks per batch envelope")
+    parser.add_argument("--drain-timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args.rate, args.duration, parse_mix(args.mix), args.duplicates,
+                                  args.drain_timeout, args.seed, args.content_type, args.tasks_per_message))
+    print(f"\nSent {report['sent']:,} at {report['offered_rate']:.1f} msg/s, "
+          f"completed {report['completed']:,} ({report['dead_lettered']:,} dead-lettered)")
+    print(f"Sustained throughput: {report['throughput']:.1f} msg/s")
+    print(f"Latency p50 {report['p50_latency'] * 1000:.0f} ms, p99 {report['p99_latency'] * 1000:.0f} ms")
+    print(f"Peak RSS: {report['peak_rss_mb']:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
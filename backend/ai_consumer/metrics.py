@@ -0,0 +1,138 @@
+# backend/ai_consumer/metrics.py
+#
+# Minimal in-process metrics registry rendered in the Prometheus text exposition
+# format (served at /metrics by backend/ai_consumer_main.py). Everything runs on the
+# consumer's event loop, so no locking is needed.
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: str) -> str:
+    """Label value escaping required by the text format: backslash, quote, newline."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.counts: Dict[Tuple[str, ...], List[int]] = {}  # per bucket, last one is +Inf
+        self.sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        counts = self.counts.setdefault(key, [0] * (len(self.buckets) + 1))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[key] = self.sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        lines = []
+        for key, counts in self.counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {self.sums[key]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TASKS_PROCESSED = REGISTRY.register(Counter("ai_tasks_processed_total", "Tasks completed successfully", ["type"]))
+TASKS_FAILED = REGISTRY.register(Counter("ai_tasks_failed_total", "Task attempts that raised", ["type"]))
+TASKS_RETRIED = REGISTRY.register(Counter("ai_tasks_retried_total", "Failed tasks sent to a retry delay queue",
+                                          ["type"]))
+TASKS_DEAD_LETTERED = REGISTRY.register(Counter("ai_tasks_dead_lettered_total", "Tasks sent to the dead-letter queue",
+                                                ["type"]))
+TASKS_IN_FLIGHT = REGISTRY.register(Gauge("ai_tasks_in_flight", "Messages currently being processed"))
+QUEUE_WAIT = REGISTRY.register(Histogram("ai_task_queue_wait_seconds",
+                                         "Time from publish (message timestamp) to processing start", ["type"]))
+PROCESSING_TIME = REGISTRY.register(Histogram("ai_task_processing_seconds", "Processing time per message", ["type"]))
+DB_CALL_TIME = REGISTRY.register(Histogram("ai_db_call_seconds", "Database call latency", ["operation"]))
+SCORE_CACHE_HITS = REGISTRY.register(Counter("ai_fraud_score_cache_hits_total",
+                                             "Fraud scores answered from the content-hash cache", ["tier"]))
+SCORE_CACHE_MISSES = REGISTRY.register(Counter("ai_fraud_score_cache_misses_total",
+                                               "Fraud scores not cached, computed by the model"))
+TASKS_IN_FLIGHT.set(0)
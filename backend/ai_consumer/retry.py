@@ -0,0 +1,71 @@
+# backend/ai_consumer/retry.py
+import logging
+from typing import List, Optional
+
+from ai_consumer.transport import Transport
+
+logger = logging.getLogger(__name__)
+
+RETRY_HEADER = "x-retry-count"
+ERROR_HEADER = "x-last-error"
+
+
+class RetryRouter:
+    """
+    Failed messages are republished instead of being lost:
+      - to "<queue>.retry.<n>": a delay queue whose TTL (delays_ms[n]) dead-letters the
+        message back onto the work queue, with the attempt count in RETRY_HEADER
+      - to "<queue>.dead" once max_attempts have failed, or straight away for messages
+        that can never succeed (e.g. malformed JSON)
+    The original is acked only after the republish is confirmed by the broker (or left
+    to the caller, when only part of it was dead-lettered).
+    """
+
+    def __init__(self, queue_name: str, delays_ms: List[int], max_attempts: int):
+        self.queue_name = queue_name
+        self.delays_ms = delays_ms
+        self.max_attempts = max_attempts
+        self.dead_letter_queue = f"{queue_name}.dead"
+        self.transport = None
+
+    def retry_queue(self, attempt: int) -> str:
+        return f"{self.queue_name}.retry.{min(attempt, len(self.delays_ms)) - 1}"
+
+    async def declare(self, transport: Transport):
+        for n, delay in enumerate(self.delays_ms):
+            await transport.declare_queue(f"{self.queue_name}.retry.{n}", arguments={
+                "x-message-ttl": delay,
+                "x-dead-letter-exchange": "",
+                "x-dead-letter-routing-key": self.queue_name,
+            })
+        await transport.declare_queue(self.dead_letter_queue)
+        self.transport = transport
+
+    async def _republish(self, message, routing_key: str, headers: dict, body: Optional[bytes] = None,
+                         ack: bool = True):
+        await self.transport.publish(routing_key, message.body if body is None else body, headers,
+                                     message.content_type)
+        if ack:
+            await message.ack()
+
+    async def retry(self, message, error: Exception, body: Optional[bytes] = None) -> bool:
+        """
+        Schedules another attempt after a backoff delay, or dead-letters the message.
+        `body` replaces the original body (e.g. only the failed tasks of a batch).
+        Returns True if it will be retried.
+        """
+        attempt = int((message.headers or {}).get(RETRY_HEADER, 0)) + 1
+        if attempt >= self.max_attempts or not self.delays_ms:
+            await self.dead_letter(message, error, attempt, body)
+            return False
+        headers = {**(message.headers or {}), RETRY_HEADER: attempt, ERROR_HEADER: repr(error)[:500]}
+        await self._republish(message, self.retry_queue(attempt), headers, body)
+        logger.warning(f"Attempt {attempt} failed, retrying via {self.retry_queue(attempt)}: {error}")
+        return True
+
+    async def dead_letter(self, message, error: Exception, attempt: int = 1, body: Optional[bytes] = None,
+                          ack: bool = True):
+        """`ack=False` leaves the original unsettled, for the rest of it to be processed."""
+        headers = {**(message.headers or {}), RETRY_HEADER: attempt, ERROR_HEADER: repr(error)[:500]}
+        await self._republish(message, self.dead_letter_queue, headers, body, ack)
+        logger.error(f"Message dead-lettered to {self.dead_letter_queue} after {attempt} attempt(s): {error}")
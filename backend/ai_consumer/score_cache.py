@@ -0,0 +1,115 @@
+# backend/ai_consumer/score_cache.py
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+
+from pymongo import ReplaceOne
+
+from ai_consumer import db as mongo
+from ai_consumer.metrics import DB_CALL_TIME, SCORE_CACHE_HITS, SCORE_CACHE_MISSES
+
+SCORES_COLLECTION = "fraud_scores"
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 of a resume's content: unchanged resumes keep the same cache entry."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class MongoScoreStore:
+    """
+    Scores by (model version, content hash) in the consumer's MongoDB (ai_consumer.db);
+    a TTL index on expires_at lets MongoDB drop old entries on its own.
+    """
+
+    def __init__(self, collection: str = SCORES_COLLECTION):
+        self.collection_name = collection
+
+    @property
+    def collection(self):
+        return mongo.db[self.collection_name] if mongo.db is not None else None
+
+    async def ensure_indexes(self):
+        if self.collection is not None:
+            await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def get_many(self, model_version: str, hashes: Iterable[str]) -> Dict[str, float]:
+        if self.collection is None:
+            return {}
+        now = datetime.now(timezone.utc)
+        query = {"_id": {"$in": [f"{model_version}:{h}" for h in hashes]}}
+        with DB_CALL_TIME.time(operation=f"{self.collection_name}.find"):
+            docs = await self.collection.find(query).to_list(length=None)
+        # The TTL monitor runs about once a minute, so check expiry here too
+        return {doc["content_hash"]: doc["score"] for doc in docs
+                if doc["expires_at"].replace(tzinfo=timezone.utc) > now}
+
+    async def put_many(self, model_version: str, scores: Dict[str, float], ttl_seconds: float):
+        if self.collection is None or not scores:
+            return
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+        requests = [ReplaceOne({"_id": f"{model_version}:{h}"},
+                               {"_id": f"{model_version}:{h}", "model_version": model_version, "content_hash": h,
+                                "score": score, "expires_at": expires_at}, upsert=True)
+                    for h, score in scores.items()]
+        with DB_CALL_TIME.time(operation=f"{self.collection_name}.bulk_write"):
+            await self.collection.bulk_write(requests, ordered=False)
+
+
+class ScoreCache:
+    """
+    Fraud scores by content hash for one model version, in a bounded in-memory LRU in
+    front of `store`. Entries of other model versions are never returned (the version
+    is part of the key) but are left for the TTL index to expire, so old and new
+    consumers can share the store during a rolling deploy.
+    """
+
+    def __init__(self, model_version: str, store: Optional[MongoScoreStore] = None, max_entries: int = 50_000,
+                 ttl_seconds: float = 30 * 24 * 3600):
+        self.model_version = model_version
+        self.store = store
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._scores: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+
+    async def ensure_indexes(self):
+        if self.store:
+            await self.store.ensure_indexes()
+
+    def _remember(self, digest: str, score: float):
+        self._scores[digest] = (time.monotonic() + self.ttl, score)
+        self._scores.move_to_end(digest)
+        while len(self._scores) > self.max_entries:
+            self._scores.popitem(last=False)
+
+    async def get_many(self, hashes: Iterable[str]) -> Dict[str, float]:
+        """Cached scores for the given content hashes; missing ones need scoring."""
+        found, missing = {}, []
+        now = time.monotonic()
+        for digest in dict.fromkeys(hashes):
+            entry = self._scores.get(digest)
+            if entry is not None and entry[0] > now:
+                self._scores.move_to_end(digest)
+                found[digest] = entry[1]
+            else:
+                self._scores.pop(digest, None)
+                missing.append(digest)
+        if found:
+            SCORE_CACHE_HITS.inc(len(found), tier="memory")
+        stored = await self.store.get_many(self.model_version, missing) if missing and self.store else {}
+        for digest, score in stored.items():
+            self._remember(digest, score)
+        found.update(stored)
+        if stored:
+            SCORE_CACHE_HITS.inc(len(stored), tier="mongo")
+        if len(missing) > len(stored):
+            SCORE_CACHE_MISSES.inc(len(missing) - len(stored))
+        return found
+
+    async def put_many(self, scores: Dict[str, float]):
+        for digest, score in scores.items():
+            self._remember(digest, score)
+        if self.store:
+            await self.store.put_many(self.model_version, scores, self.ttl)
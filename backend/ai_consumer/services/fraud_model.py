@@ -0,0 +1,32 @@
+# backend/ai_consumer/services/fraud_model.py
+
+import os
+from typing import List
+
+from ai_consumer.cpu_pool import cpu_handler
+
+MODEL_VERSION = os.getenv("FRAUD_MODEL_VERSION", "placeholder-1")
+
+_model = None
+
+
+def load_model():
+    """
+    Loads the fraud model once per process (in the CPU pool, once per worker at start).
+    """
+    global _model
+    if _model is None:
+        # Placeholder: a real model would be deserialised from disk here
+        _model = {"version": MODEL_VERSION, "base_score": 0.05}
+    return _model
+
+
+@cpu_handler("fraud_score", warmup=load_model)
+def score_resumes(contents: List[str]) -> List[float]:
+    """
+    CPU-bound fraud scoring of a batch of resume texts, one score per text and nothing
+    else as input, so a score can be cached by the text's hash. Takes and returns plain
+    lists so the batch crosses the process boundary in one pickle.
+    """
+    model = load_model()
+    return [model["base_score"] for _ in contents]
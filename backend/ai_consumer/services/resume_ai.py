@@ -2,15 +2,64 @@
 
 import asyncio
 import logging
+from typing import Dict, List
+
+from ai_consumer.metrics import DB_CALL_TIME
+from ai_consumer.score_cache import content_hash
+from ai_consumer.services.fraud_model import score_resumes
 
 logger = logging.getLogger(__name__)
 
-async def reanalyze_resume(db, resume_id: str):
+async def reanalyze_resume(db, resume_id: str, cpu_pool=None, score_cache=None):
     """
     Placeholder function for AI resume re-analysis.
     """
-    logger.info(f"Reanalyzing resume with ID: {resume_id}")
-    # Simulate async AI processing
-    await asyncio.sleep(1)
-    result = {"resume_id": resume_id, "status": "reanalyzed", "fraud_score": 0.05}
-    return result
+    results = await reanalyze_resumes(db, [resume_id], cpu_pool, score_cache)
+    return results[resume_id]
+
+async def fetch_resume_contents(db, resume_ids: List[str]) -> Dict[str, str]:
+    """
+    Placeholder bulk read of the resumes' text, {resume_id: content}.
+    """
+    # Simulate async I/O (bulk fetch)
+    with DB_CALL_TIME.time(operation="resumes.find_many"):
+        await asyncio.sleep(0.5)
+    return {resume_id: f"resume {resume_id}" for resume_id in resume_ids}
+
+async def reanalyze_resumes(db, resume_ids: List[str], cpu_pool=None, score_cache=None) -> Dict[str, dict]:
+    """
+    Batched re-analysis: one bulk read of the resumes, one model call for the whole
+    batch and one bulk write of the results. Returns {resume_id: result}; ids missing
+    from the result failed and should be retried by the caller.
+
+    The CPU-bound scoring runs in `cpu_pool` (ai_consumer.cpu_pool.CpuPool) when given,
+    otherwise inline. With `score_cache` (ai_consumer.score_cache.ScoreCache) only
+    resumes whose content the current model has not scored yet reach the model.
+    """
+    logger.info(f"Reanalyzing {len(resume_ids)} resume(s): {resume_ids}")
+    contents = await fetch_resume_contents(db, resume_ids)
+    hashes = {resume_id: content_hash(contents[resume_id]) for resume_id in resume_ids}
+    cached = await score_cache.get_many(hashes.values()) if score_cache is not None else {}
+
+    # The model only sees the content, so resumes with identical text are scored once
+    to_score = {hashes[resume_id]: contents[resume_id] for resume_id in resume_ids
+                if hashes[resume_id] not in cached}
+    if to_score:
+        texts = list(to_score.values())
+        if cpu_pool is not None:
+            scores = await cpu_pool.run("fraud_score", texts)
+        else:
+            scores = score_resumes(texts)
+        new_scores = dict(zip(to_score, scores))
+        if score_cache is not None:
+            await score_cache.put_many(new_scores)
+        cached = {**cached, **new_scores}
+    logger.info(f"Scored {len(to_score)} distinct content(s) for {len(resume_ids)} resume(s), the rest from cache")
+
+    # Simulate async I/O (bulk update)
+    with DB_CALL_TIME.time(operation="resumes.update_many"):
+        await asyncio.sleep(0.5)
+    return {
+        resume_id: {"resume_id": resume_id, "status": "reanalyzed", "fraud_score": cached[hashes[resume_id]]}
+        for resume_id in resume_ids
+    }
@@ -0,0 +1,199 @@
+# backend/ai_consumer/transport.py
+#
+# Broker interface used by the consumer. A delivery exposes body, headers,
+# content_type, timestamp, ack() and nack(requeue=...), the subset of
+# aio_pika.IncomingMessage the consumer relies on.
+#   AmqpTransport     - RabbitMQ through aio_pika (production)
+#   InMemoryTransport - asyncio queues in this process with the same ack/nack, prefetch
+#                       and TTL dead-lettering (delay queue) behaviour, for offline
+#                       benchmarks (see ai_consumer/loadgen.py)
+import asyncio
+import itertools
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Dict, Optional
+
+import aio_pika
+
+
+class Transport(ABC):
+    @abstractmethod
+    async def connect(self):
+        ...
+
+    @abstractmethod
+    async def declare_queue(self, name: str, arguments: Optional[dict] = None):
+        ...
+
+    @abstractmethod
+    async def set_prefetch(self, count: int, channel_wide: bool = False):
+        """
+        Unacked-delivery limit, as AMQP basic.qos. Per consumer (the default) it only
+        applies to consumers started afterwards; channel_wide applies at once to every
+        consumer on the channel, including running ones.
+        """
+
+    @abstractmethod
+    async def publish(self, queue: str, body: bytes, headers: Optional[dict] = None,
+                      content_type: Optional[str] = None):
+        ...
+
+    @abstractmethod
+    def consume(self, queue: str) -> AsyncIterator:
+        ...
+
+    @abstractmethod
+    async def close(self):
+        ...
+
+
+class AmqpTransport(Transport):
+    def __init__(self, url: str):
+        self.url = url
+        self.connection = None
+        self.channel = None
+        self.queues: Dict[str, aio_pika.abc.AbstractQueue] = {}
+
+    async def connect(self):
+        self.connection = await aio_pika.connect_robust(self.url)
+        self.channel = await self.connection.channel()
+
+    async def declare_queue(self, name, arguments=None):
+        self.queues[name] = await self.channel.declare_queue(name, durable=True, arguments=arguments)
+
+    async def set_prefetch(self, count, channel_wide=False):
+        # RabbitMQ reads global=true as "shared by the channel's consumers"
+        await self.channel.set_qos(prefetch_count=count, global_=channel_wide)
+
+    async def publish(self, queue, body, headers=None, content_type=None):
+        message = aio_pika.Message(body, headers=headers, content_type=content_type,
+                                   timestamp=datetime.now(timezone.utc),
+                                   delivery_mode=aio_pika.DeliveryMode.PERSISTENT)
+        await self.channel.default_exchange.publish(message, routing_key=queue)
+
+    async def consume(self, queue):
+        async with self.queues[queue].iterator() as queue_iter:
+            async for message in queue_iter:
+                yield message
+
+    async def close(self):
+        if self.connection is not None:
+            await self.connection.close()
+
+
+class InMemoryMessage:
+    def __init__(self, transport: "InMemoryTransport", queue: str, body: bytes, headers: Optional[dict],
+                 content_type: Optional[str], timestamp: datetime):
+        self.transport = transport
+        self.queue = queue
+        self.body = body
+        self.headers = dict(headers or {})
+        self.content_type = content_type
+        self.timestamp = timestamp
+        self.message_id = next(transport._ids)
+        self.settled = False
+
+    async def ack(self):
+        self.transport._settle(self, "ack")
+
+    async def nack(self, requeue: bool = True):
+        self.transport._settle(self, "requeue" if requeue else "drop")
+
+
+class InMemoryTransport(Transport):
+    """
+    Broker stand-in with RabbitMQ's consumer-visible semantics: a per-consumer prefetch
+    limit fixed when the consumer starts and a channel-wide one that applies at once
+    (both enforced), nack(requeue=True) puts the message back, and a
+    queue declared with x-message-ttl / x-dead-letter-routing-key forwards each message
+    there when its TTL expires. Hooks for benchmarks: `on_publish(queue, message)` sees
+    every publish and `on_settle(message, outcome)` every ack/nack.
+    """
+
+    def __init__(self, on_publish: Optional[Callable[[str, InMemoryMessage], None]] = None,
+                 on_settle: Optional[Callable[[InMemoryMessage, str], None]] = None):
+        self.on_publish = on_publish
+        self.on_settle = on_settle
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.arguments: Dict[str, dict] = {}
+        self.prefetch = 0  # per consumer, for consumers started later; 0 = unlimited, as in AMQP
+        self.channel_prefetch = 0
+        self.unacked = 0
+        self._capacity = asyncio.Condition()
+        self._ids = itertools.count()
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+
+    async def connect(self):
+        pass
+
+    async def declare_queue(self, name, arguments=None):
+        self.queues.setdefault(name, asyncio.Queue())
+        self.arguments[name] = arguments or {}
+
+    async def set_prefetch(self, count, channel_wide=False):
+        async with self._capacity:
+            if channel_wide:
+                self.channel_prefetch = count
+            else:
+                self.prefetch = count
+            self._capacity.notify_all()
+
+    async def publish(self, queue, body, headers=None, content_type=None):
+        message = InMemoryMessage(self, queue, body, headers, content_type, datetime.now(timezone.utc))
+        if self.on_publish is not None:
+            self.on_publish(queue, message)
+        self._enqueue(queue, message)
+
+    def _enqueue(self, queue: str, message: InMemoryMessage):
+        arguments = self.arguments.get(queue, {})
+        if "x-message-ttl" in arguments:
+            # Delay queue: nobody consumes it; on expiry the message is dead-lettered
+            target = arguments.get("x-dead-letter-routing-key", queue)
+            self._timers[message.message_id] = asyncio.get_running_loop().call_later(
+                arguments["x-message-ttl"] / 1000, self._forward, target, message)
+            return
+        self.queues.setdefault(queue, asyncio.Queue()).put_nowait(message)
+
+    def _forward(self, queue: str, message: InMemoryMessage):
+        del self._timers[message.message_id]
+        self._enqueue(queue, InMemoryMessage(self, queue, message.body, message.headers, message.content_type,
+                                             message.timestamp))
+
+    def _settle(self, message: InMemoryMessage, outcome: str):
+        if message.settled:
+            raise RuntimeError(f"Message {message.message_id} already settled")
+        message.settled = True
+        self.unacked -= 1
+        if outcome == "requeue":
+            self.queues[message.queue].put_nowait(
+                InMemoryMessage(self, message.queue, message.body, message.headers, message.content_type,
+                                message.timestamp))
+        if self.on_settle is not None:
+            self.on_settle(message, outcome)
+        asyncio.get_running_loop().create_task(self._notify())
+
+    async def _notify(self):
+        async with self._capacity:
+            self._capacity.notify_all()
+
+    async def consume(self, queue):
+        source = self.queues[queue]
+        consumer_prefetch = self.prefetch  # as in RabbitMQ, later per-consumer changes do not apply
+
+        def has_capacity():
+            return all(self.unacked < limit for limit in (consumer_prefetch, self.channel_prefetch) if limit)
+
+        while True:
+            async with self._capacity:
+                await self._capacity.wait_for(has_capacity)
+            message = await source.get()
+            self.unacked += 1
+            yield message
+
+    def pending(self) -> int:
+        """Messages waiting in queues or delay timers (not yet delivered)."""
+        return sum(q.qsize() for q in self.queues.values()) + len(self._timers)
+
+    async def close(self):
+        for timer in self._timers.values():
+            timer.cancel()
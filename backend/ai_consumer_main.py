@@ -1,22 +1,41 @@
 # backend/ai_consumer_main.py
 import asyncio
+import os
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from ai_consumer.db import connect_db, disconnect_db
+from ai_consumer.metrics import REGISTRY
+
+# Run the queue consumer inside this process, so /metrics reports its activity
+RUN_CONSUMER = os.getenv("RUN_CONSUMER", "0") == "1"
 
 app = FastAPI(title="AI Consumer Service")
 
 @app.on_event("startup")
 async def startup_event():
     await connect_db()
+    if RUN_CONSUMER:
+        from ai_consumer.main import main as consumer_main
+        app.state.consumer_stop = asyncio.Event()
+        app.state.consumer = asyncio.create_task(consumer_main(stop=app.state.consumer_stop))
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    consumer = getattr(app.state, "consumer", None)
+    if consumer is not None:
+        app.state.consumer_stop.set()  # graceful: drains in-flight tasks first
+        await asyncio.gather(consumer, return_exceptions=True)
     await disconnect_db()
 
 @app.get("/health")
 async def health_check():
     return {"status": "AI Consumer Service running ✅"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Consumer metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # Optional: standalone run
 if __name__ == "__main__":
     import uvicorn
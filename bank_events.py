@@ -0,0 +1,122 @@
+# bank_events.py
+#
+# Pluggable event recorders for bank_queue_simulation.py. The customer process calls
+#   arrive(customer_id, now)
+#   start(customer_id, now, wait, teller)
+#   leave(customer_id, arrival, start, end, teller)
+# only when recorder.enabled is True, so NullRecorder costs one boolean check per customer.
+#
+# Sinks:
+#   NullRecorder       - tracing off
+#   ConsoleRecorder    - the original human-readable prints
+#   RingBufferRecorder - keeps the last `capacity` completed customers in memory
+#   ColumnarRecorder   - appends fixed-size binary rows to a file; read back with load_events()
+from collections import deque
+
+import numpy as np
+
+EVENT_DTYPE = np.dtype([
+    ("customer_id", np.int64),
+    ("arrival", np.float64),
+    ("start", np.float64),
+    ("end", np.float64),
+    ("teller", np.int16),
+])
+
+
+class EventRecorder:
+    """Base sink: every hook is a no-op. Subclasses override the ones they need."""
+
+    enabled = True
+
+    def arrive(self, customer_id, now):
+        pass
+
+    def start(self, customer_id, now, wait, teller):
+        pass
+
+    def leave(self, customer_id, arrival, start, end, teller):
+        pass
+
+    def close(self):
+        pass
+
+
+class NullRecorder(EventRecorder):
+    """Disabled sink; the simulation skips every hook."""
+
+    enabled = False
+
+
+NULL_RECORDER = NullRecorder()
+
+
+class ConsoleRecorder(EventRecorder):
+    """Prints each event as it happens (slow for long runs: terminal I/O dominates)."""
+
+    def arrive(self, customer_id, now):
+        print(f"Customer {customer_id} arrives at the bank at {now:.2f} minutes.")
+
+    def start(self, customer_id, now, wait, teller):
+        print(f"Customer {customer_id} starts being served at {now:.2f} (waited {wait:.2f} mins).")
+
+    def leave(self, customer_id, arrival, start, end, teller):
+        print(f"Customer {customer_id} leaves the bank at {end:.2f}.")
+
+
+class RingBufferRecorder(EventRecorder):
+    """Keeps the most recent `capacity` completed customers as (id, arrival, start, end, teller)."""
+
+    def __init__(self, capacity=10_000):
+        self.rows = deque(maxlen=capacity)
+
+    def leave(self, customer_id, arrival, start, end, teller):
+        self.rows.append((customer_id, arrival, start, end, teller))
+
+    def to_array(self):
+        return np.array(list(self.rows), dtype=EVENT_DTYPE)
+
+
+class ColumnarRecorder(EventRecorder):
+    """
+    Buffers completed customers in a preallocated structured array and appends it to
+    `path` as raw EVENT_DTYPE rows whenever it fills, so memory stays bounded.
+    """
+
+    def __init__(self, path, buffer_rows=65_536):
+        self.path = path
+        self.buffer = np.empty(buffer_rows, dtype=EVENT_DTYPE)
+        self.size = 0
+        self.rows_written = 0
+        self._file = open(path, "wb")
+
+    def leave(self, customer_id, arrival, start, end, teller):
+        self.buffer[self.size] = (customer_id, arrival, start, end, teller)
+        self.size += 1
+        if self.size == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        if self.size:
+            self.buffer[:self.size].tofile(self._file)
+            self.rows_written += self.size
+            self.size = 0
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_events(path, mmap=True):
+    """Reads a ColumnarRecorder file back as a structured array (memory-mapped by default)."""
+    if mmap:
+        return np.memmap(path, dtype=EVENT_DTYPE, mode="r")
+    return np.fromfile(path, dtype=EVENT_DTYPE)
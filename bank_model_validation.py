@@ -0,0 +1,86 @@
+# bank_model_validation.py
+#
+# Cross-checks the closed-form steady-state answers used by bank_queue_simulation.analyze()
+# against long SimPy replications of the same model:
+#   - M/M/c over a grid of tellers and loads: Erlang-C (queue_analytics.mmc_metrics)
+#   - M/G/1 with non-exponential service: the Pollaczek-Khinchine mean wait
+# and checks that the queue_kernel.py engine reproduces SimPy's start times exactly on
+# shared arrival/service streams.
+# A check passes when the analytic value lies inside the simulation's confidence interval
+# or within REL_TOLERANCE of the simulated mean (waiting-time percentiles averaged over
+# replications carry a small bias that a tight interval can expose).
+# Exits with status 1 if any check fails.
+import sys
+import time
+
+import numpy as np
+
+from bank_queue_simulation import RANDOM_SEED, NUM_WORKERS, run_replications, run_staffed
+from queue_analytics import mg1_mean_wait, mmc_metrics
+from queue_kernel import QueueRun, poisson_arrivals, service_durations
+
+SERVICE_TIME = 8
+REPLICATIONS = 80
+CONFIDENCE = 0.99           # ~30 checks per run: a 95% interval would miss one or two by chance
+SIM_TIME = 20_000
+WARMUP = 2_000
+REL_TOLERANCE = 0.05
+
+MMC_GRID = [(1, 0.5), (1, 0.8), (2, 0.5), (2, 0.8), (4, 0.7), (8, 0.9)]  # (tellers, utilization)
+MMC_METRICS = ["mean_wait", "p90_wait", "p95_wait", "utilization", "mean_queue_length"]
+MG1_CASES = {"deterministic": 0.0, "uniform": 1.0 / 3.0}                 # distribution: service SCV
+MG1_UTILIZATION = 0.7
+KERNEL_TELLERS = [1, 2, 4]
+KERNEL_SIM_TIME = 5_000
+
+
+def check(label, metric, expected, simulated):
+    mean, half_width = simulated
+    ok = abs(mean - expected) <= max(half_width, REL_TOLERANCE * abs(expected))
+    print(f"{label:<28}{metric:<20}{expected:>10.3f}{mean:>10.3f}   ± {half_width:<8.3f}"
+          f"{'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def simulate(tellers, arrival_rate, distribution, seed):
+    summary, _ = run_replications(REPLICATIONS, tellers, SIM_TIME, 1.0 / arrival_rate, SERVICE_TIME,
+                                  WARMUP, seed, NUM_WORKERS, CONFIDENCE, distribution)
+    return summary
+
+
+def main():
+    start = time.perf_counter()
+    print(f"{'Case':<28}{'Metric':<20}{'Analytic':>10}{'Sim':>10}   {int(CONFIDENCE * 100)}% CI")
+    failures = 0
+
+    for case, (tellers, utilization) in enumerate(MMC_GRID):
+        arrival_rate = utilization * tellers / SERVICE_TIME
+        expected = mmc_metrics(tellers, arrival_rate, SERVICE_TIME)
+        summary = simulate(tellers, arrival_rate, "exponential", RANDOM_SEED + case)
+        label = f"M/M/{tellers} rho={utilization}"
+        failures += sum(not check(label, m, expected[m], summary[m]) for m in MMC_METRICS)
+
+    arrival_rate = MG1_UTILIZATION / SERVICE_TIME
+    for case, (distribution, scv) in enumerate(MG1_CASES.items(), start=len(MMC_GRID)):
+        summary = simulate(1, arrival_rate, distribution, RANDOM_SEED + case)
+        label = f"M/G/1 {distribution} rho={MG1_UTILIZATION}"
+        failures += not check(label, "mean_wait", mg1_mean_wait(arrival_rate, SERVICE_TIME, scv),
+                              summary["mean_wait"])
+
+    rng = np.random.default_rng(RANDOM_SEED)
+    for tellers in KERNEL_TELLERS:
+        arrival_times = poisson_arrivals(rng, SERVICE_TIME / (0.85 * tellers), KERNEL_SIM_TIME)
+        durations = service_durations(rng, SERVICE_TIME, arrival_times.size)
+        kernel = QueueRun(arrival_times, durations, tellers, KERNEL_SIM_TIME)
+        simpy_run = run_staffed(arrival_times, durations, [(0, tellers)], KERNEL_SIM_TIME)
+        ok = np.allclose(kernel.starts, simpy_run.starts, equal_nan=True)
+        print(f"{f'kernel vs SimPy c={tellers}':<28}{'start times':<20}{arrival_times.size:>10d} customers   "
+              f"{'ok' if ok else 'FAIL'}")
+        failures += not ok
+
+    print(f"\n{failures} failed check(s) in {time.perf_counter() - start:.1f} s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
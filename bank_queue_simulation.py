@@ -1,6 +1,18 @@
 import simpy
 import random
 import statistics
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import stats
+
+from arrival_profiles import load_arrival_profile, nhpp_arrivals
+from bank_events import NULL_RECORDER, ColumnarRecorder, ConsoleRecorder, RingBufferRecorder
+from queue_analytics import mmc_metrics
+from queue_kernel import QueueRun, poisson_arrivals, service_durations
 
 # --- Simulation Parameters ---
 RANDOM_SEED = 42
@@ -8,45 +20,414 @@ NUM_TELLERS = 2          # Number of bank tellers
 SIM_TIME = 60            # Simulation time (in minutes)
 ARRIVAL_INTERVAL = 5     # Time between customer arrivals (avg)
 SERVICE_TIME = 8         # Avg service time per customer
+SERVICE_DISTRIBUTION = "exponential"   # "exponential", "deterministic", "uniform" or "lognormal"
+SERVICE_CV = 0.5                       # coefficient of variation of the lognormal service time
+
+# --- Event tracing (single run) ---
+TRACE_SINK = "console"           # "none", "console", "ring" (last TRACE_RING_SIZE in memory) or "columnar"
+TRACE_RING_SIZE = 10_000
+TRACE_FILE = "bank_events.bin"   # columnar sink output; read with bank_events.load_events()
+
+# --- Replication study ---
+SIMULATION_MODE = "single"   # "single" (one traced run), "replications", "analyze" (steady state) or "profile"
+NUM_REPLICATIONS = 200       # independent replications, each with its own seed
+WARMUP_TIME = 0              # minutes discarded at the start of each replication (steady-state studies)
+CONFIDENCE = 0.95            # confidence level for the reported intervals
+NUM_WORKERS = os.cpu_count() or 1
+ENGINE = "simpy"             # "simpy" or "kernel" (queue_kernel.py: array-driven FIFO, no tracing)
+
+# --- Steady-state analysis (simulation fallback when Erlang-C does not apply) ---
+STEADY_STATE_TIME = 20_000   # minutes per replication
+STEADY_STATE_WARMUP = 2_000
+STEADY_STATE_REPLICATIONS = 40
+
+# --- Time-varying arrivals (SIMULATION_MODE = "profile") ---
+ARRIVAL_PROFILE_CSV = "branch_arrival_profile.csv"   # "minute,arrivals_per_hour" knots from opening
+PROFILE_SHAPE = "step"        # "step", "linear" or "spline" between knots
+NHPP_METHOD = "inversion"     # "inversion" or "thinning"
+PROFILE_TELLERS = 7
+PROFILE_SIM_TIME = 480        # one 8-hour day
+PERIOD_MINUTES = 60           # width of the per-period wait statistics
+PROFILE_REPLICATIONS = 100
+
+
+class BankStats:
+    """Per-run record of every customer's arrival, service start and departure times."""
 
-wait_times = []          # To record how long each customer waits
+    def __init__(self):
+        self.arrivals = []
+        self.starts = []
+        self.ends = []
 
+    def arrive(self, now):
+        self.arrivals.append(now)
+        self.starts.append(math.nan)
+        self.ends.append(math.nan)
+        return len(self.arrivals) - 1
 
-def customer(env, name, bank):
-    """Each customer arrives, waits, and is served."""
+    @property
+    def wait_times(self):
+        return [start - arrival for arrival, start in zip(self.arrivals, self.starts) if not math.isnan(start)]
+
+
+def draw_service(rng, service_time, distribution=SERVICE_DISTRIBUTION):
+    """One service duration with mean service_time from the named distribution."""
+    if distribution == "exponential":
+        return rng.expovariate(1.0 / service_time)
+    if distribution == "deterministic":
+        return service_time
+    if distribution == "uniform":
+        return rng.uniform(0.0, 2.0 * service_time)
+    if distribution == "lognormal":
+        sigma = math.sqrt(math.log(1.0 + SERVICE_CV ** 2))
+        return rng.lognormvariate(math.log(service_time) - sigma ** 2 / 2, sigma)
+    raise ValueError(f"Unknown service distribution: {distribution!r}")
+
+
+def customer(env, customer_id, bank, rng, service_time, bank_stats, recorder=NULL_RECORDER,
+             service_duration=None, service_distribution=SERVICE_DISTRIBUTION):
+    """Each customer arrives, waits, and is served (for service_duration if pre-drawn)."""
+    trace = recorder.enabled
     arrival_time = env.now
-    print(f"{name} arrives at the bank at {arrival_time:.2f} minutes.")
+    record = bank_stats.arrive(arrival_time)
+    if trace:
+        recorder.arrive(customer_id, arrival_time)
 
     with bank.request() as request:
         yield request  # Wait for an available teller
-        wait = env.now - arrival_time
-        wait_times.append(wait)
+        start_time = env.now
+        bank_stats.starts[record] = start_time
+        teller = bank.free_tellers.pop()
 
-        print(f"{name} starts being served at {env.now:.2f} (waited {wait:.2f} mins).")
-        yield env.timeout(random.expovariate(1.0 / SERVICE_TIME))
-        print(f"{name} leaves the bank at {env.now:.2f}.")
+        if trace:
+            recorder.start(customer_id, start_time, start_time - arrival_time, teller)
+        if service_duration is None:
+            service_duration = draw_service(rng, service_time, service_distribution)
+        yield env.timeout(service_duration)
+        bank_stats.ends[record] = env.now
+        bank.free_tellers.append(teller)
+        if trace:
+            recorder.leave(customer_id, arrival_time, start_time, env.now, teller)
 
 
-def setup(env, num_tellers, arrival_interval):
+def make_bank(env, num_tellers, priority=False):
+    """A teller pool; priority=True allows off-shift tellers to be modelled (see staffing_manager)."""
+    bank = simpy.PriorityResource(env, num_tellers) if priority else simpy.Resource(env, num_tellers)
+    bank.free_tellers = list(range(num_tellers - 1, -1, -1))  # stack of idle teller ids
+    return bank
+
+
+def setup(env, num_tellers, arrival_interval, rng=random, service_time=SERVICE_TIME,
+          bank_stats=None, recorder=NULL_RECORDER, service_distribution=SERVICE_DISTRIBUTION):
     """Create a bank, some tellers, and keep generating customers."""
-    bank = simpy.Resource(env, num_tellers)
+    bank = make_bank(env, num_tellers)
+    bank_stats = bank_stats if bank_stats is not None else BankStats()
 
     # Create customers as long as simulation runs
     i = 0
     while True:
-        yield env.timeout(random.expovariate(1.0 / arrival_interval))
+        yield env.timeout(rng.expovariate(1.0 / arrival_interval))
         i += 1
-        env.process(customer(env, f"Customer {i}", bank))
+        env.process(customer(env, i, bank, rng, service_time, bank_stats, recorder,
+                             service_distribution=service_distribution))
+
+
+def scheduled_setup(env, bank, arrival_times, service_durations, bank_stats, recorder=NULL_RECORDER):
+    """Feed pre-generated customers (sorted arrival times and their service durations) into the bank."""
+    for i, (arrival, duration) in enumerate(zip(arrival_times, service_durations), start=1):
+        if arrival > env.now:
+            yield env.timeout(arrival - env.now)
+        env.process(customer(env, i, bank, None, None, bank_stats, recorder, float(duration)))
+
+
+def staffing_manager(env, bank, schedule):
+    """
+    Varies the number of on-duty tellers over time. `schedule` is a list of
+    (start_minute, tellers); the bank's capacity is the maximum staffing level.
+    Each off-duty teller is a high-priority request holding one slot, so a teller
+    going off shift finishes the current customer first.
+    """
+    held = []
+    for start, tellers in schedule:
+        if start > env.now:
+            yield env.timeout(start - env.now)
+        off_duty = bank.capacity - tellers
+        while len(held) < off_duty:
+            held.append(bank.request(priority=-1))
+        while len(held) > off_duty:
+            request = held.pop()
+            if request.triggered:
+                bank.release(request)
+            else:
+                request.cancel()
+
+
+def run_staffed(arrival_times, service_durations, schedule, sim_time, recorder=NULL_RECORDER):
+    """
+    One run driven by pre-generated arrival and service streams (common random numbers
+    across staffing candidates) under a time-varying staffing schedule.
+
+    Returns:
+      BankStats for the run
+    """
+    env = simpy.Environment()
+    bank = make_bank(env, max(tellers for _, tellers in schedule), priority=True)
+    bank_stats = BankStats()
+    env.process(staffing_manager(env, bank, schedule))
+    env.process(scheduled_setup(env, bank, arrival_times, service_durations, bank_stats, recorder))
+    env.run(until=sim_time)
+    return bank_stats
+
+
+# --- Replications ---
+def summarize_run(bank_stats, num_tellers, sim_time, warmup=0.0):
+    """
+    Per-replication metrics over the observation window [warmup, sim_time].
+    Queue length and utilization are exact time averages built from the
+    customers' (arrival, start, end) intervals.
+    """
+    arrivals = np.asarray(bank_stats.arrivals, dtype=float)
+    raw_starts = np.asarray(bank_stats.starts, dtype=float)
+    started = ~np.isnan(raw_starts)
+    starts = np.where(started, raw_starts, sim_time)  # still queueing at the end
+    ends = np.nan_to_num(np.asarray(bank_stats.ends, dtype=float), nan=sim_time)
+    window = sim_time - warmup
+
+    def time_in_window(a, b):
+        return np.clip(np.minimum(b, sim_time) - np.maximum(a, warmup), 0.0, None).sum()
+
+    observed = started & (arrivals >= warmup)
+    waits = starts[observed] - arrivals[observed]
+    return {
+        "customers_served": float(np.count_nonzero(observed)),
+        "mean_wait": float(waits.mean()) if waits.size else 0.0,
+        "p90_wait": float(np.percentile(waits, 90)) if waits.size else 0.0,
+        "p95_wait": float(np.percentile(waits, 95)) if waits.size else 0.0,
+        "utilization": float(time_in_window(starts, ends) / (num_tellers * window)),
+        "mean_queue_length": float(time_in_window(arrivals, starts) / window),
+    }
+
+
+def period_waits(bank_stats, period_minutes, sim_time):
+    """
+    Waits grouped by the period in which each customer arrived; customers still queueing
+    at sim_time count with their wait so far.
+
+    Returns:
+      list with one array of waits per period
+    """
+    arrivals = np.asarray(bank_stats.arrivals, dtype=float)
+    starts = np.nan_to_num(np.asarray(bank_stats.starts, dtype=float), nan=sim_time)
+    periods = (arrivals // period_minutes).astype(int)
+    n_periods = int(math.ceil(sim_time / period_minutes))
+    order = np.argsort(periods, kind="stable")
+    bounds = np.searchsorted(periods[order], np.arange(n_periods + 1))
+    waits = (starts - arrivals)[order]
+    return [waits[bounds[p]:bounds[p + 1]] for p in range(n_periods)]
+
+
+def run_replication(seed, num_tellers=NUM_TELLERS, sim_time=SIM_TIME, arrival_interval=ARRIVAL_INTERVAL,
+                    service_time=SERVICE_TIME, warmup=WARMUP_TIME, service_distribution=SERVICE_DISTRIBUTION,
+                    engine=ENGINE):
+    """One independent run with its own RNG and statistics; returns summarize_run()."""
+    if engine == "kernel":
+        np_rng = np.random.default_rng(seed)
+        arrival_times = poisson_arrivals(np_rng, arrival_interval, sim_time)
+        durations = service_durations(np_rng, service_time, arrival_times.size, service_distribution, SERVICE_CV)
+        return summarize_run(QueueRun(arrival_times, durations, num_tellers, sim_time), num_tellers, sim_time, warmup)
+    rng = random.Random(seed)
+    bank_stats = BankStats()
+    env = simpy.Environment()
+    env.process(setup(env, num_tellers, arrival_interval, rng, service_time, bank_stats,
+                      service_distribution=service_distribution))
+    env.run(until=sim_time)
+    return summarize_run(bank_stats, num_tellers, sim_time, warmup)
+
+
+def _run_replication_task(args):
+    return run_replication(*args)
+
+
+def confidence_interval(values, confidence=CONFIDENCE):
+    """Returns (mean, half_width) of a Student-t interval for the mean."""
+    values = np.asarray(values, dtype=float)
+    mean = float(values.mean())
+    if values.size < 2:
+        return mean, math.nan
+    t_value = stats.t.ppf(0.5 + confidence / 2, values.size - 1)
+    return mean, float(t_value * values.std(ddof=1) / math.sqrt(values.size))
+
+
+def run_replications(num_replications=NUM_REPLICATIONS, num_tellers=NUM_TELLERS, sim_time=SIM_TIME,
+                     arrival_interval=ARRIVAL_INTERVAL, service_time=SERVICE_TIME, warmup=WARMUP_TIME,
+                     seed=RANDOM_SEED, workers=NUM_WORKERS, confidence=CONFIDENCE,
+                     service_distribution=SERVICE_DISTRIBUTION, engine=ENGINE):
+    """
+    Runs independent replications across a process pool and aggregates each metric.
+
+    Returns:
+      {metric: (mean, half_width)} and the list of per-replication results
+    """
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(num_replications)]
+    tasks = [(s, num_tellers, sim_time, arrival_interval, service_time, warmup, service_distribution, engine)
+             for s in seeds]
+
+    if workers > 1 and num_replications > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, num_replications // (4 * workers))
+            results = list(pool.map(_run_replication_task, tasks, chunksize=chunksize))
+    else:
+        results = [_run_replication_task(task) for task in tasks]
+
+    summary = {metric: confidence_interval([r[metric] for r in results], confidence) for metric in results[0]}
+    return summary, results
+
+
+def run_profile(profile, num_tellers=PROFILE_TELLERS, sim_time=PROFILE_SIM_TIME, period_minutes=PERIOD_MINUTES,
+                num_replications=PROFILE_REPLICATIONS, service_time=SERVICE_TIME,
+                service_distribution=SERVICE_DISTRIBUTION, method=NHPP_METHOD, seed=RANDOM_SEED,
+                engine=ENGINE, confidence=CONFIDENCE):
+    """
+    Replications under a time-varying arrival profile. Each replication's arrivals are
+    generated in one NHPP draw and fed to the bank as pre-generated streams.
+
+    Returns:
+      one dict per period: start, expected_arrivals, arrivals, mean_wait (mean, half_width)
+      across replications, and p95_wait pooled over all replications' customers
+    """
+    n_periods = int(math.ceil(sim_time / period_minutes))
+    counts = np.zeros((num_replications, n_periods))
+    mean_waits = np.zeros((num_replications, n_periods))
+    pooled = [[] for _ in range(n_periods)]
+    for r, rep_seed in enumerate(np.random.SeedSequence(seed).spawn(num_replications)):
+        rng = np.random.default_rng(rep_seed)
+        arrival_times = nhpp_arrivals(profile, sim_time, rng, method)
+        durations = service_durations(rng, service_time, arrival_times.size, service_distribution, SERVICE_CV)
+        if engine == "kernel":
+            bank_stats = QueueRun(arrival_times, durations, num_tellers, sim_time)
+        else:
+            bank_stats = run_staffed(arrival_times, durations, [(0, num_tellers)], sim_time)
+        for p, waits in enumerate(period_waits(bank_stats, period_minutes, sim_time)):
+            counts[r, p] = waits.size
+            mean_waits[r, p] = waits.mean() if waits.size else 0.0
+            pooled[p].append(waits)
+
+    periods = []
+    for p in range(n_periods):
+        start = p * period_minutes
+        waits = np.concatenate(pooled[p])
+        periods.append({
+            "start": start,
+            "expected_arrivals": profile.expected_arrivals(start, min(start + period_minutes, sim_time)),
+            "arrivals": float(counts[:, p].mean()),
+            "mean_wait": confidence_interval(mean_waits[:, p], confidence),
+            "p95_wait": float(np.percentile(waits, 95)) if waits.size else 0.0,
+        })
+    return periods
+
+
+# --- Steady-state analysis ---
+def is_markovian(service_distribution=SERVICE_DISTRIBUTION):
+    """
+    True when the model is an M/M/c queue. Arrivals here are always Poisson at a constant
+    rate (time-varying profiles are simulated by run_profile), so only service matters.
+    """
+    return service_distribution == "exponential"
+
+
+def analyze(num_tellers=NUM_TELLERS, arrival_interval=ARRIVAL_INTERVAL, service_time=SERVICE_TIME,
+            service_distribution=SERVICE_DISTRIBUTION,
+            num_replications=STEADY_STATE_REPLICATIONS, sim_time=STEADY_STATE_TIME,
+            warmup=STEADY_STATE_WARMUP, seed=RANDOM_SEED, workers=NUM_WORKERS, confidence=CONFIDENCE,
+            engine="kernel"):
+    """
+    Steady-state metrics of the bank: Erlang-C in closed form for M/M/c, otherwise long
+    replications with a warm-up period (no tracing needed, so the kernel engine by default).
+
+    Returns:
+      source ("erlang-c" or "simulation") and {metric: (value, half_width)};
+      analytic values are exact, so their half-width is 0
+    """
+    if is_markovian(service_distribution):
+        metrics = mmc_metrics(num_tellers, 1.0 / arrival_interval, service_time)
+        return "erlang-c", {metric: (value, 0.0) for metric, value in metrics.items()}
+    summary, _ = run_replications(num_replications, num_tellers, sim_time, arrival_interval, service_time,
+                                  warmup, seed, workers, confidence, service_distribution, engine)
+    return "simulation", summary
+
+
+def make_recorder(sink=TRACE_SINK):
+    if sink == "console":
+        return ConsoleRecorder()
+    if sink == "ring":
+        return RingBufferRecorder(TRACE_RING_SIZE)
+    if sink == "columnar":
+        return ColumnarRecorder(TRACE_FILE)
+    return NULL_RECORDER
+
+
+def run_single():
+    print("🏦 Bank Queue Simulation — Event-Driven Model")
+    random.seed(RANDOM_SEED)
+    bank_stats = BankStats()
+    recorder = make_recorder()
+    env = simpy.Environment()
+    env.process(setup(env, NUM_TELLERS, ARRIVAL_INTERVAL, bank_stats=bank_stats, recorder=recorder))
+    env.run(until=SIM_TIME)
+    recorder.close()
+    if TRACE_SINK == "columnar":
+        print(f"Wrote {recorder.rows_written:,} customer records to {TRACE_FILE}")
+
+    # --- Results ---
+    wait_times = bank_stats.wait_times
+    average_wait = statistics.mean(wait_times)
+    print(f"\nAverage wait time: {average_wait:.2f} minutes")
+    print(f"Total customers served: {len(wait_times)}")
+
+
+def run_study():
+    print("🏦 Bank Queue Simulation — Replication Study")
+    print(f"{NUM_REPLICATIONS} replications x {SIM_TIME} min, {NUM_TELLERS} tellers, "
+          f"warm-up {WARMUP_TIME} min, {NUM_WORKERS} worker(s), {ENGINE} engine")
+    summary, _ = run_replications()
+    print(f"\n{'Metric':<20}{'Mean':>10}   {int(CONFIDENCE * 100)}% CI")
+    for metric, (mean, half_width) in summary.items():
+        print(f"{metric:<20}{mean:>10.2f}   ± {half_width:.2f}")
+
+
+def run_analysis():
+    print("🏦 Bank Queue Simulation — Steady-State Analysis")
+    print(f"{NUM_TELLERS} tellers, mean interarrival {ARRIVAL_INTERVAL} min, "
+          f"{SERVICE_DISTRIBUTION} service with mean {SERVICE_TIME} min")
+    start = time.perf_counter()
+    source, summary = analyze()
+    elapsed = time.perf_counter() - start
+    print(f"\nSource: {source} ({elapsed * 1000:.1f} ms)")
+    for metric, (value, half_width) in summary.items():
+        interval = f"   ± {half_width:.2f}" if half_width else ""
+        print(f"{metric:<20}{value:>10.2f}{interval}")
+
+
+def run_profile_study():
+    print("🏦 Bank Queue Simulation — Time-Varying Arrivals")
+    profile = load_arrival_profile(ARRIVAL_PROFILE_CSV, PROFILE_SHAPE)
+    print(f"Profile {ARRIVAL_PROFILE_CSV} ({PROFILE_SHAPE}, {NHPP_METHOD}), {PROFILE_TELLERS} tellers, "
+          f"{PROFILE_REPLICATIONS} replications, {ENGINE} engine")
+    periods = run_profile(profile)
+    print(f"\n{'Period':<10}{'Expected':>10}{'Arrivals':>10}{'Mean wait':>12}{'':>10}{'P95 wait':>10}")
+    for period in periods:
+        mean, half_width = period["mean_wait"]
+        print(f"{period['start']:>6.0f}min{period['expected_arrivals']:>10.1f}{period['arrivals']:>10.1f}"
+              f"{mean:>12.2f}   ± {half_width:<5.2f}{period['p95_wait']:>10.2f}")
 
 
 # --- Run Simulation ---
-print("🏦 Bank Queue Simulation — Event-Driven Model")
-random.seed(RANDOM_SEED)
-env = simpy.Environment()
-env.process(setup(env, NUM_TELLERS, ARRIVAL_INTERVAL))
-env.run(until=SIM_TIME)
-
-# --- Results ---
-average_wait = statistics.mean(wait_times)
-print(f"\nAverage wait time: {average_wait:.2f} minutes")
-print(f"Total customers served: {len(wait_times)}")
+if __name__ == "__main__":
+    if SIMULATION_MODE == "replications":
+        run_study()
+    elif SIMULATION_MODE == "analyze":
+        run_analysis()
+    elif SIMULATION_MODE == "profile":
+        run_profile_study()
+    else:
+        run_single()
@@ -0,0 +1,283 @@
+# monte_carlo_integrator.py
+#
+# General-purpose Monte Carlo integration over the d-dimensional unit cube,
+# grown from the hit-or-miss idea in monte_carlo_pi.py.
+#
+# The integrand must be vectorized: f(x) takes an (n, d) array and returns n values.
+#
+#   result = integrate(f, dim=3, n_samples=200_000, method="vegas")
+#   print(result.estimate, "+/-", result.error)
+#
+# Methods:
+#   "plain"      - independent uniform points
+#   "stratified" - equal-volume strata, pilot pass then Neyman allocation (more samples
+#                  where the integrand varies most)
+#   "lhs"        - Latin hypercube, error from independent replicates
+#   "sobol"      - scrambled Sobol points (randomized QMC), error from replicates
+#   "vegas"      - VEGAS adaptive importance-sampling grid, iterations combined by
+#                  inverse-variance weighting
+from collections import namedtuple
+import math
+
+import numpy as np
+from scipy.stats import qmc
+
+IntegrationResult = namedtuple("IntegrationResult", ["estimate", "error", "n_evals", "method"])
+
+METHODS = ("plain", "stratified", "lhs", "sobol", "vegas")
+
+
+# -------------------------
+# Helpers
+# -------------------------
+def _evaluate(f, x):
+    values = np.asarray(f(x), dtype=float)
+    if values.shape != (len(x),):
+        raise ValueError(f"Integrand must return shape ({len(x)},), got {values.shape}")
+    return values
+
+
+def _replicate_result(values_per_replicate, method):
+    """
+    Combines independent randomized replicates (LHS / scrambled Sobol):
+    estimate = mean of replicate means, error = their standard error.
+    """
+    means = np.array([v.mean() for v in values_per_replicate])
+    n_evals = sum(len(v) for v in values_per_replicate)
+    error = means.std(ddof=1) / math.sqrt(len(means)) if len(means) > 1 else float("nan")
+    return IntegrationResult(float(means.mean()), float(error), n_evals, method)
+
+
+# -------------------------
+# Plain Monte Carlo
+# -------------------------
+def integrate_plain(f, dim, n_samples, rng, batch_size=1_000_000):
+    total = 0.0
+    total_sq = 0.0
+    remaining = n_samples
+    while remaining > 0:
+        n = min(batch_size, remaining)
+        values = _evaluate(f, rng.random((n, dim)))
+        total += values.sum()
+        total_sq += np.dot(values, values)
+        remaining -= n
+
+    mean = total / n_samples
+    var = max(total_sq / n_samples - mean ** 2, 0.0) * n_samples / max(n_samples - 1, 1)
+    return IntegrationResult(mean, math.sqrt(var / n_samples), n_samples, "plain")
+
+
+# -------------------------
+# Stratified sampling with adaptive (Neyman) allocation
+# -------------------------
+def _strata_divisions(dim, n_strata_max):
+    """
+    Divisions per dimension so the number of equal-volume strata is at most n_strata_max.
+    In high dimensions only the leading dimensions are split (2 ways each).
+    """
+    per_dim = int(math.floor(n_strata_max ** (1.0 / dim) + 1e-9))
+    if per_dim >= 2:
+        return np.full(dim, per_dim)
+    divisions = np.ones(dim, dtype=int)
+    divisions[:max(0, min(dim, int(math.log2(max(n_strata_max, 1)))))] = 2
+    return divisions
+
+
+def _sample_strata(f, divisions, counts, rng):
+    """
+    Draws counts[s] uniform points inside every stratum s and returns per-stratum
+    (sum, sum of squares) of the integrand.
+    """
+    n_strata = len(counts)
+    strata = np.repeat(np.arange(n_strata), counts)
+    cells = np.stack(np.unravel_index(strata, divisions), axis=1)
+    x = (cells + rng.random((len(strata), len(divisions)))) / divisions
+    values = _evaluate(f, x)
+    sums = np.bincount(strata, weights=values, minlength=n_strata)
+    sums_sq = np.bincount(strata, weights=values * values, minlength=n_strata)
+    return sums, sums_sq
+
+
+def integrate_stratified(f, dim, n_samples, rng, pilot_fraction=0.25):
+    n_pilot = max(2, int(n_samples * pilot_fraction))
+    divisions = _strata_divisions(dim, n_pilot // 8)
+    n_strata = int(np.prod(divisions))
+    volume = 1.0 / n_strata
+
+    # Pilot pass: equal allocation, enough points per stratum for a usable variance
+    pilot_counts = np.full(n_strata, max(2, n_pilot // n_strata))
+    sums, sums_sq = _sample_strata(f, divisions, pilot_counts, rng)
+    counts = pilot_counts.astype(float)
+
+    # Main pass: spend the rest of the budget in proportion to each stratum's std dev
+    remaining = n_samples - int(pilot_counts.sum())
+    if remaining > 0:
+        means = sums / counts
+        stds = np.sqrt(np.maximum(sums_sq / counts - means ** 2, 0.0))
+        weights = stds / stds.sum() if stds.sum() > 0 else np.full(n_strata, 1.0 / n_strata)
+        extra = np.floor(weights * remaining).astype(int)
+        extra_sums, extra_sums_sq = _sample_strata(f, divisions, extra, rng)
+        sums += extra_sums
+        sums_sq += extra_sums_sq
+        counts += extra
+
+    means = sums / counts
+    variances = np.maximum(sums_sq / counts - means ** 2, 0.0) * counts / (counts - 1)
+    estimate = volume * means.sum()
+    error = volume * math.sqrt(np.sum(variances / counts))
+    return IntegrationResult(float(estimate), float(error), int(counts.sum()), "stratified")
+
+
+# -------------------------
+# Latin hypercube and Sobol (randomized replicates)
+# -------------------------
+def integrate_lhs(f, dim, n_samples, rng, replicates=16):
+    n_per = max(2, n_samples // replicates)
+    values = [_evaluate(f, qmc.LatinHypercube(d=dim, seed=rng).random(n_per))
+              for _ in range(replicates)]
+    return _replicate_result(values, "lhs")
+
+
+def integrate_sobol(f, dim, n_samples, rng, replicates=16):
+    m = max(1, int(math.log2(max(2, n_samples // replicates))))  # 2**m points per replicate
+    values = [_evaluate(f, qmc.Sobol(d=dim, scramble=True, seed=rng).random_base2(m))
+              for _ in range(replicates)]
+    return _replicate_result(values, "sobol")
+
+
+# -------------------------
+# VEGAS adaptive importance sampling
+# -------------------------
+def _refine_grid(edges, bin_weights, alpha):
+    """
+    Moves the bin edges of one dimension so every new bin holds an equal share of
+    the (smoothed, damped) importance weights.
+    """
+    n_bins = len(bin_weights)
+    d = bin_weights.copy()
+    # Smooth with neighbours, then damp so the grid does not jump around between iterations
+    d[1:-1] = (bin_weights[:-2] + bin_weights[1:-1] + bin_weights[2:]) / 3.0
+    d[0] = (bin_weights[0] + bin_weights[1]) / 2.0
+    d[-1] = (bin_weights[-2] + bin_weights[-1]) / 2.0
+    if d.sum() <= 0:
+        return edges
+    d /= d.sum()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.where((d > 0) & (d < 1), ((d - 1.0) / np.log(d)) ** alpha, 0.0)
+    if r.sum() <= 0:
+        return edges
+
+    # Invert the cumulative weight to place the new edges
+    cumulative = np.concatenate(([0.0], np.cumsum(r)))
+    targets = np.linspace(0.0, cumulative[-1], n_bins + 1)
+    new_edges = np.interp(targets, cumulative, edges)
+    new_edges[0], new_edges[-1] = 0.0, 1.0
+    return new_edges
+
+
+def integrate_vegas(f, dim, n_samples, rng, iterations=10, n_bins=50, alpha=1.5):
+    edges = np.tile(np.linspace(0.0, 1.0, n_bins + 1), (dim, 1))
+    n_per = max(2, n_samples // iterations)
+    estimates, variances = [], []
+
+    for it in range(iterations):
+        # Map uniform y -> x through the piecewise-linear grid; J is the Jacobian
+        y = rng.random((n_per, dim)) * n_bins
+        bins = np.minimum(y.astype(int), n_bins - 1)
+        widths = np.diff(edges, axis=1)
+        cols = np.arange(dim)
+        w = widths[cols, bins]
+        x = edges[cols, bins] + (y - bins) * w
+        jacobian = np.prod(w * n_bins, axis=1)
+
+        fj = _evaluate(f, x) * jacobian
+        mean = fj.mean()
+        var = fj.var(ddof=1) / n_per
+        # The first iteration runs on an unadapted grid; only use it if it is all we have
+        if it > 0 or iterations == 1:
+            estimates.append(mean)
+            variances.append(var)
+
+        fj2 = fj * fj
+        for k in range(dim):
+            bin_weights = np.bincount(bins[:, k], weights=fj2, minlength=n_bins)
+            edges[k] = _refine_grid(edges[k], bin_weights, alpha)
+
+    estimates = np.array(estimates)
+    variances = np.array(variances)
+    if np.any(variances == 0):
+        return IntegrationResult(float(estimates[variances == 0][0]), 0.0, n_per * iterations, "vegas")
+    weights = 1.0 / variances
+    estimate = np.sum(weights * estimates) / weights.sum()
+    error = math.sqrt(1.0 / weights.sum())
+    return IntegrationResult(float(estimate), float(error), n_per * iterations, "vegas")
+
+
+# -------------------------
+# Public API
+# -------------------------
+def integrate(f, dim, n_samples=100_000, method="vegas", seed=None, **options):
+    """
+    Estimates the integral of a vectorized f over [0, 1]^dim.
+
+    Returns:
+      IntegrationResult(estimate, error, n_evals, method); error is one standard error.
+    """
+    rng = np.random.default_rng(seed)
+    if method == "plain":
+        return integrate_plain(f, dim, n_samples, rng, **options)
+    if method == "stratified":
+        return integrate_stratified(f, dim, n_samples, rng, **options)
+    if method == "lhs":
+        return integrate_lhs(f, dim, n_samples, rng, **options)
+    if method == "sobol":
+        return integrate_sobol(f, dim, n_samples, rng, **options)
+    if method == "vegas":
+        return integrate_vegas(f, dim, n_samples, rng, **options)
+    raise ValueError(f"Unknown method {method!r}; choose one of {METHODS}")
+
+
+def integrate_box(f, lower, upper, n_samples=100_000, method="vegas", seed=None, **options):
+    """
+    Integrates a vectorized f over the hyper-rectangle [lower, upper] by rescaling
+    it to the unit cube (e.g. a probability: f = joint density over the box).
+    """
+    lower = np.asarray(lower, dtype=float)
+    upper = np.asarray(upper, dtype=float)
+    span = upper - lower
+    volume = float(np.prod(span))
+    result = integrate(lambda u: f(lower + u * span), len(lower), n_samples, method, seed, **options)
+    return result._replace(estimate=result.estimate * volume, error=result.error * volume)
+
+
+# Main program
+def main():
+    # Peaked integrand: product of narrow Gaussians, exact integral ~ 1 over the cube
+    dim = 4
+    width = 0.1
+
+    def peak(x):
+        return np.prod(np.exp(-((x - 0.5) / width) ** 2) / (width * math.sqrt(math.pi)), axis=1)
+
+    exact = math.erf(0.5 / width) ** dim
+    n_samples = 200_000
+
+    print(f"Integrating a {dim}-d Gaussian peak (exact = {exact:.6f}) with {n_samples:,} evaluations")
+    plain = integrate(peak, dim, n_samples, method="plain", seed=1)
+    for method in METHODS:
+        result = plain if method == "plain" else integrate(peak, dim, n_samples, method=method, seed=1)
+        gain = (plain.error / result.error) ** 2 if result.error > 0 else float("inf")
+        print(f"{method:>10}: {result.estimate:.6f} ± {result.error:.6f} "
+              f"(true error {result.estimate - exact:+.6f}, variance reduction x{gain:,.0f})")
+
+    # Probability over a hyper-rectangle: 3 independent standard normals in [-1, 2]^3
+    def normal_density(x):
+        return np.exp(-0.5 * np.sum(x * x, axis=1)) / (2 * math.pi) ** 1.5
+
+    box = integrate_box(normal_density, [-1, -1, -1], [2, 2, 2], n_samples, method="sobol", seed=1)
+    exact_box = (0.5 * (math.erf(2 / math.sqrt(2)) - math.erf(-1 / math.sqrt(2)))) ** 3
+    print(f"\nP(X in [-1, 2]^3) = {box.estimate:.6f} ± {box.error:.6f} (exact {exact_box:.6f})")
+
+
+if __name__ == "__main__":
+    main()
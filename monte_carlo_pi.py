@@ -1,32 +1,123 @@
-import random
+# monte_carlo_pi.py
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sim_plotting import RasterAccumulator, density_image, finish_figure
 import matplotlib.pyplot as plt
 
-# Number of random points
-num_points = 10000
-inside_circle = 0
+# -------------------------
+# User parameters (change)
+# -------------------------
+RANDOM_SEED = 42
+num_points = 100_000_000     # total random points (10**10 runs in bounded memory, just longer)
+chunk_size = 5_000_000       # points generated per task; memory per worker ~ 16 bytes * chunk_size
+num_workers = os.cpu_count() or 1
+plot_sample_size = 50_000    # at most this many points are kept for the density plot
+plot_resolution = 256        # pixels per side of the density raster
+
+
+# -------------------------
+# Helper: one chunk
+# -------------------------
+def count_hits(seed, n, sample_n):
+    """
+    Draws n points in the unit square and counts those inside the quarter circle.
+
+    Returns:
+      hits: number of points with x^2 + y^2 <= 1
+      sample: (sample_n, 2) array of points from this chunk, for plotting
+    """
+    rng = np.random.default_rng(seed)
+    points = rng.random((2, n))
+    sample = points[:, :sample_n].T.copy()
+
+    np.square(points, out=points)
+    hits = int(np.count_nonzero(points[0] + points[1] <= 1.0))
+    return hits, sample
+
+
+def _count_hits_task(args):
+    return count_hits(*args)
+
+
+def chunk_plan(total, size, sample_total, seed):
+    """
+    Splits `total` points into tasks of at most `size` points, each with its own
+    independent seed. Points are i.i.d., so taking a proportional slice from every
+    chunk gives a uniform sample of the whole stream without keeping it in memory.
+    """
+    num_chunks = math.ceil(total / size)
+    seeds = np.random.SeedSequence(seed).spawn(num_chunks)
+    sample_per_point = min(1.0, sample_total / total)
+
+    plan = []
+    remaining = total
+    for chunk_seed in seeds:
+        n = min(size, remaining)
+        remaining -= n
+        plan.append((chunk_seed, n, int(round(n * sample_per_point))))
+    return plan
 
-x_inside, y_inside = [], []
-x_outside, y_outside = [], []
 
-for _ in range(num_points):
-    x, y = random.random(), random.random()
-    distance = x**2 + y**2
-    if distance <= 1:
-        inside_circle += 1
-        x_inside.append(x)
-        y_inside.append(y)
+# -------------------------
+# Estimator
+# -------------------------
+def estimate_pi(total=num_points, size=chunk_size, workers=num_workers,
+                sample_total=plot_sample_size, seed=RANDOM_SEED):
+    """
+    Returns:
+      pi_estimate, standard_error, sample points (at most ~sample_total), elapsed seconds
+    """
+    plan = chunk_plan(total, size, sample_total, seed)
+    hits = 0
+    samples = []
+
+    start = time.perf_counter()
+    if workers > 1 and len(plan) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk_hits, sample in pool.map(_count_hits_task, plan):
+                hits += chunk_hits
+                samples.append(sample)
     else:
-        x_outside.append(x)
-        y_outside.append(y)
-
-# Estimate of Pi
-pi_estimate = 4 * inside_circle / num_points
-print(f"Estimated π ≈ {pi_estimate}")
-
-# Visualization
-plt.figure(figsize=(6, 6))
-plt.scatter(x_inside, y_inside, color="blue", s=2, label="Inside Circle")
-plt.scatter(x_outside, y_outside, color="red", s=2, label="Outside Circle")
-plt.title(f"Monte Carlo Estimation of π ≈ {pi_estimate}")
-plt.legend()
-plt.show()
+        for task in plan:
+            chunk_hits, sample = count_hits(*task)
+            hits += chunk_hits
+            samples.append(sample)
+    elapsed = time.perf_counter() - start
+
+    # Each point is a Bernoulli(pi/4) trial, so the estimator 4*p_hat has SE 4*sqrt(p(1-p)/N)
+    p_hat = hits / total
+    pi_estimate = 4.0 * p_hat
+    standard_error = 4.0 * math.sqrt(p_hat * (1.0 - p_hat) / total)
+    return pi_estimate, standard_error, np.concatenate(samples), elapsed
+
+
+# Main program
+def main():
+    pi_estimate, standard_error, sample, elapsed = estimate_pi()
+
+    print(f"Points: {num_points:,} in chunks of {chunk_size:,} on {num_workers} worker(s)")
+    print(f"Estimated π ≈ {pi_estimate:.8f} ± {standard_error:.8f} (1 s.e.)")
+    print(f"95% confidence interval: [{pi_estimate - 1.96 * standard_error:.8f}, "
+          f"{pi_estimate + 1.96 * standard_error:.8f}]")
+    print(f"Error vs math.pi: {pi_estimate - math.pi:+.8f}")
+    print(f"Throughput: {num_points / elapsed:,.0f} points/s ({elapsed:.2f} s)")
+
+    # Visualization: rasterize the sample instead of scattering individual markers
+    raster = RasterAccumulator((0.0, 1.0, 0.0, 1.0), resolution=plot_resolution)
+    raster.update(sample[:, 0], sample[:, 1])
+    theta = np.linspace(0.0, np.pi / 2, 200)
+
+    fig, ax = plt.subplots(figsize=(6, 6))
+    density_image(ax, raster.counts, raster.extent, log=False)
+    ax.plot(np.cos(theta), np.sin(theta), color="red", linewidth=1.5, label="Quarter circle")
+    ax.set_title(f"Monte Carlo Estimation of π ≈ {pi_estimate:.6f} ({len(sample):,} sampled points)")
+    ax.legend()
+    finish_figure(fig, "monte_carlo_pi")
+
+
+if __name__ == "__main__":
+    main()
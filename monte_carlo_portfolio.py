@@ -1,6 +1,7 @@
 # monte_carlo_portfolio.py
 import numpy as np
 import pandas as pd
+from sim_plotting import FanChartAccumulator, fan_chart, finish_figure, lttb, minmax_decimate
 import matplotlib.pyplot as plt
 
 # ---------------------------
@@ -36,6 +37,10 @@ dt = T / num_steps
 
 num_simulations = 2000   # number of Monte Carlo paths
 
+# Plotting
+num_sample_paths = 3     # individual paths drawn over the percentile fan
+plot_max_points = 1000   # each drawn path is decimated to about this many points
+
 # ---------------------------
 # Helper: simulate correlated GBM
 # ---------------------------
@@ -107,23 +112,30 @@ VaR_95 = max(0.0, initial_portfolio_value - p5)
 print(f"Estimated VaR (95% conf) over {T} year: {VaR_95:,.2f}")
 
 # ---------------------------
-# Plot a sample of simulated portfolio paths
+# Plot percentile fan of simulated portfolio paths
 # ---------------------------
-plt.figure(figsize=(10,6))
-# Plot some sample paths (not all, to avoid clutter)
-sample_count = 50
-for i in range(sample_count):
-    plt.plot(portfolio_paths[i], linewidth=0.8, alpha=0.7)
-plt.plot(np.mean(portfolio_paths, axis=0), color='black', linewidth=2.0, label='Mean path')
-plt.title("Monte Carlo Simulated Portfolio Paths (sample)")
-plt.xlabel("Step (days)")
-plt.ylabel("Portfolio Value")
-plt.grid(True)
-plt.legend()
-plt.show()
+# Percentiles are streamed per time step, so the chart costs the same for any num_simulations
+fan = FanChartAccumulator(num_steps + 1)
+fan.update(portfolio_paths)
+
+fig, ax = plt.subplots(figsize=(10,6))
+steps = np.arange(num_steps + 1)
+fan_chart(ax, steps, fan.percentiles(), mean=fan.mean(), label='Median path')
+# A few individual paths (LTTB keeps their shape) and the worst one (min/max keeps its drawdowns)
+for i, path in enumerate(portfolio_paths[:num_sample_paths]):
+    ax.plot(*lttb(steps, path, plot_max_points), color='gray', linewidth=0.6,
+            label='Sample paths' if i == 0 else None)
+worst = portfolio_paths[np.argmin(final_values)]
+ax.plot(*minmax_decimate(steps, worst, plot_max_points // 2), color='red', linewidth=0.8, label='Worst path')
+ax.set_title(f"Monte Carlo Simulated Portfolio Paths (percentile fan, {num_simulations} sims)")
+ax.set_xlabel("Step (days)")
+ax.set_ylabel("Portfolio Value")
+ax.grid(True)
+ax.legend()
+finish_figure(fig, "portfolio_paths_fan")
 
 # Plot histogram of final portfolio values
-plt.figure(figsize=(8,5))
+fig = plt.figure(figsize=(8,5))
 plt.hist(final_values, bins=60)
 plt.axvline(p5, color='red', linestyle='--', label=f'5th pct: {p5:.2f}')
 plt.axvline(mean_final, color='black', linestyle='-', label=f'mean: {mean_final:.2f}')
@@ -131,4 +143,4 @@ plt.title("Distribution of Final Portfolio Values")
 plt.xlabel("Portfolio Value at T")
 plt.ylabel("Frequency")
 plt.legend()
-plt.show()
+finish_figure(fig, "portfolio_final_values")
@@ -1,5 +1,7 @@
 # monte_carlo_retirement.py
 import numpy as np
+from scipy.signal import lfilter
+from sim_plotting import FanChartAccumulator, fan_chart, finish_figure
 import matplotlib.pyplot as plt
 
 # -------------------------
@@ -7,15 +9,31 @@ import matplotlib.pyplot as plt
 # -------------------------
 np.random.seed(42)
 
+# Engine mode:
+#   "classic"    -> constant inflation, fixed retirement_years
+#   "stochastic" -> AR(1) inflation correlated with returns, horizons drawn from a life table
+engine_mode = "classic"
+
 # Economic assumptions (annual, in decimals)
 mu = 0.06            # expected nominal return (6%)
 sigma = 0.12         # annual volatility (12%)
-inflation = 0.02     # annual inflation (2%)
+inflation = 0.02     # annual inflation (2%) - long-run mean in stochastic mode
+
+# Stochastic inflation (AR(1)), used when engine_mode == "stochastic"
+#   infl_t = inflation + inflation_phi * (infl_{t-1} - inflation) + inflation_sigma * eps_t
+inflation_phi = 0.6            # persistence of inflation shocks
+inflation_sigma = 0.01         # volatility of inflation innovations
+inflation_start = inflation    # inflation in the year before the simulation starts
+return_inflation_corr = -0.2   # correlation between return shocks and inflation innovations
 
 # Timing
 years_to_retirement = 20
 retirement_years = 30
-years_total = years_to_retirement + retirement_years
+
+# Mortality, used when engine_mode == "stochastic"
+retirement_age = 65
+max_age = 110                  # everyone is assumed dead by this age
+life_table_csv = None          # CSV with columns "age,qx"; None uses a built-in Gompertz table
 
 # Cash flow
 initial_portfolio = 200000.0    # starting savings (₵ or $)
@@ -24,76 +42,172 @@ withdrawal_real = 40000.0       # desired real withdrawal per year in retirement
 
 # Simulation control
 num_simulations = 5000
-plot_sample_paths = 50
 
 # -------------------------
-# Helper: single simulation
+# Helpers: life table
+# -------------------------
+def gompertz_life_table(ages, modal_age=88.0, dispersion=10.0):
+    """
+    Returns one-year death probabilities q_x for the given integer ages,
+    from a Gompertz hazard mu(x) = exp((x - modal_age) / dispersion) / dispersion.
+    """
+    ages = np.asarray(ages, dtype=float)
+    cum_hazard = np.exp((ages - modal_age) / dispersion) * (np.exp(1.0 / dispersion) - 1.0)
+    return 1.0 - np.exp(-cum_hazard)
+
+
+def load_life_table(path):
+    """
+    Reads a CSV with columns "age,qx" and returns (ages, qx) as arrays.
+    """
+    table = np.genfromtxt(path, delimiter=",", names=True)
+    return table["age"].astype(int), table["qx"].astype(float)
+
+
+def retirement_horizon_pmf(ages, qx, retirement_age, max_age):
+    """
+    Returns:
+      pmf: pmf[h-1] = P(exactly h retirement years need funding), h = 1..max_age-retirement_age
+    A retiree alive at the start of a retirement year draws that year's withdrawal,
+    so h is the curtate future lifetime at retirement_age plus one.
+    """
+    lookup = dict(zip(np.asarray(ages).tolist(), np.asarray(qx).tolist()))
+    q = np.array([lookup.get(age, 1.0) for age in range(retirement_age, max_age)])
+    q[-1] = 1.0  # close the table at max_age
+
+    survival = np.concatenate(([1.0], np.cumprod(1.0 - q)[:-1]))  # alive at start of each year
+    pmf = survival * q
+    return pmf / pmf.sum()
+
+
+def sample_horizons(pmf, num_paths):
+    """
+    Draws a retirement horizon (in years, 1..len(pmf)) for every path by inverse CDF.
+    """
+    cdf = np.cumsum(pmf)
+    u = np.random.random(num_paths)
+    return np.minimum(np.searchsorted(cdf, u, side="right"), len(pmf) - 1) + 1
+
+
+# -------------------------
+# Helpers: economic scenarios
 # -------------------------
-def run_single_simulation():
+def simulate_returns_and_inflation(num_paths, num_years):
     """
     Returns:
-      balances: array of portfolio values for each year (length years_total+1)
-      ruined: boolean whether portfolio ran out (balance < 0) during retirement
-      ruin_year: year of ruin (None if never)
+      returns:   (num_paths, num_years) annual nominal returns
+      inflation: (num_paths, num_years) annual inflation rates
+    In classic mode inflation is the constant `inflation`; in stochastic mode it is an
+    AR(1) process whose innovations are correlated with the return shocks.
     """
-    balances = np.zeros(years_total + 1)
-    balances[0] = initial_portfolio
+    z_ret = np.random.standard_normal((num_paths, num_years))
+    returns = mu + sigma * z_ret
 
-    # We'll convert target withdrawal to nominal each retirement year using inflation
-    # withdrawal in nominal in year t (t counted from 0 at start)
-    ruined = False
-    ruin_year = None
+    if engine_mode != "stochastic":
+        return returns, np.full((num_paths, num_years), inflation)
+
+    z_ind = np.random.standard_normal((num_paths, num_years))
+    rho = return_inflation_corr
+    eps = rho * z_ret + np.sqrt(1.0 - rho ** 2) * z_ind
+
+    # AR(1) deviations from the mean, filtered along the time axis for all paths at once
+    zi = np.full((num_paths, 1), inflation_phi * (inflation_start - inflation))
+    deviations, _ = lfilter([1.0], [1.0, -inflation_phi], inflation_sigma * eps, axis=1, zi=zi)
+    return returns, inflation + deviations
+
+
+# -------------------------
+# Vectorized engine
+# -------------------------
+def run_vectorized_simulation(returns, inflation_paths, horizons):
+    """
+    Simulates every path at once, one vectorized step per year.
+
+    Args:
+      returns, inflation_paths: (num_paths, years_total) arrays
+      horizons: (num_paths,) number of retirement years each path must fund
+
+    Returns:
+      balances: (num_paths, years_total+1) portfolio values; frozen after ruin or death
+      ruined: boolean array, portfolio ran out within the path's own horizon
+      ruin_year: float array, year of ruin over the full horizon (nan if never)
+    """
+    num_paths, years_total = returns.shape
+    max_ret_years = years_total - years_to_retirement
+
+    # Nominal withdrawals: real target inflated from retirement start (first year unindexed)
+    ret_inflation = inflation_paths[:, years_to_retirement:]
+    price_index = np.ones((num_paths, max_ret_years))
+    price_index[:, 1:] = np.cumprod(1.0 + ret_inflation[:, :-1], axis=1)
+    withdrawals = withdrawal_real * price_index
+
+    balances = np.zeros((num_paths, years_total + 1))
+    balances[:, 0] = initial_portfolio
+    ruin_year = np.full(num_paths, np.nan)
+    solvent = np.ones(num_paths, dtype=bool)
 
     for year in range(1, years_total + 1):
-        # Pre-retirement: years 1..years_to_retirement
+        prev = balances[:, year - 1]
+        r = returns[:, year - 1]
         if year <= years_to_retirement:
-            # end-of-year contribution model:
-            # 1) apply returns to current balance for the year
-            r = np.random.normal(mu, sigma)
-            balances[year] = balances[year-1] * (1 + r)
-            # 2) add contribution at end of year
-            balances[year] += annual_contribution
+            # returns for the year, then end-of-year contribution
+            balances[:, year] = prev * (1 + r) + annual_contribution
         else:
-            # Retirement years: withdrawals then returns (conservative)
-            # compute nominal withdrawal this year (inflate the real withdrawal)
-            yrs_into_ret = year - years_to_retirement - 1  # 0-based within retirement
-            nominal_withdrawal = withdrawal_real * ((1 + inflation) ** yrs_into_ret)
-            # withdraw at start of year
-            balance_after_withdraw = balances[year-1] - nominal_withdrawal
-            if balance_after_withdraw <= 0:
-                # ruin immediately
-                balances[year] = balance_after_withdraw
-                ruined = True
-                ruin_year = year
-                # we still keep simulating negative balances to record severity, or break early
-                # break
-                # For tracking we stop at ruin and fill remainder with negative marks
-                for rem in range(year+1, years_total+1):
-                    balances[rem] = balances[year]  # stays negative
-                return balances, ruined, ruin_year
-            # apply returns for the year
-            r = np.random.normal(mu, sigma)
-            balances[year] = balance_after_withdraw * (1 + r)
+            # withdraw at start of year, then apply returns (conservative)
+            after_withdraw = prev - withdrawals[:, year - years_to_retirement - 1]
+            newly_ruined = solvent & (after_withdraw <= 0)
+            ruin_year[newly_ruined] = year
+            solvent &= ~newly_ruined
+            balances[:, year] = np.where(
+                solvent, after_withdraw * (1 + r),
+                np.where(newly_ruined, after_withdraw, prev)  # ruined paths stay negative
+            )
+
+    # Mask out years after each path's horizon: the balance is frozen at death
+    last_year = years_to_retirement + horizons
+    years = np.arange(years_total + 1)
+    at_death = balances[np.arange(num_paths), last_year]
+    balances = np.where(years[None, :] <= last_year[:, None], balances, at_death[:, None])
 
+    ruined = ruin_year <= last_year  # nan compares False
     return balances, ruined, ruin_year
 
+
+def mortality_weighted_success(ruin_year, horizon_pmf):
+    """
+    P(portfolio outlives the retiree) = sum_h P(H=h) * P(no ruin within h retirement years).
+    Uses every path's full-horizon ruin year for every h, so it has lower variance than
+    counting successes over the sampled horizons alone.
+    """
+    ruin_ret_year = ruin_year - years_to_retirement  # 1-based retirement year, nan if never
+    h = np.arange(1, len(horizon_pmf) + 1)
+    ruined_by_h = (ruin_ret_year[None, :] <= h[:, None]).mean(axis=1)
+    return float(np.dot(horizon_pmf, 1.0 - ruined_by_h))
+
+
 # -------------------------
 # Run Monte Carlo
 # -------------------------
-all_final_balances = np.zeros(num_simulations)
-ruin_flags = np.zeros(num_simulations, dtype=bool)
-ruin_years = []
+if engine_mode == "stochastic":
+    if life_table_csv:
+        table_ages, table_qx = load_life_table(life_table_csv)
+    else:
+        table_ages = np.arange(0, max_age + 1)
+        table_qx = gompertz_life_table(table_ages)
+    horizon_pmf = retirement_horizon_pmf(table_ages, table_qx, retirement_age, max_age)
+    max_retirement_years = len(horizon_pmf)
+    horizons = sample_horizons(horizon_pmf, num_simulations)
+else:
+    horizon_pmf = None
+    max_retirement_years = retirement_years
+    horizons = np.full(num_simulations, retirement_years)
+
+years_total = years_to_retirement + max_retirement_years
 
-# For plotting a selection of paths
-sample_paths = []
+returns, inflation_paths = simulate_returns_and_inflation(num_simulations, years_total)
+balances_all, ruin_flags, ruin_years = run_vectorized_simulation(returns, inflation_paths, horizons)
 
-for i in range(num_simulations):
-    balances, ruined, ruin_year = run_single_simulation()
-    all_final_balances[i] = balances[-1]
-    ruin_flags[i] = ruined
-    ruin_years.append(ruin_year if ruin_year is not None else np.nan)
-    if i < plot_sample_paths:
-        sample_paths.append(balances)
+all_final_balances = balances_all[:, -1]
 
 # -------------------------
 # Results & metrics
@@ -106,23 +220,39 @@ p1 = np.percentile(all_final_balances, 1)
 p95 = np.percentile(all_final_balances, 95)
 
 print("Monte Carlo Retirement Simulation")
+print(f"Engine mode: {engine_mode}")
 print(f"Simulations: {num_simulations}")
 print(f"Initial portfolio: {initial_portfolio:,.2f}")
 print(f"Annual contribution (pre-ret): {annual_contribution:,.2f}")
 print(f"Desired real withdrawal (retirement start): {withdrawal_real:,.2f} per year")
-print(f"Years to retirement: {years_to_retirement}, retirement years: {retirement_years}")
-print(f"Assumed mu={mu:.2%}, sigma={sigma:.2%}, inflation={inflation:.2%}")
+if engine_mode == "stochastic":
+    print(f"Years to retirement: {years_to_retirement}, retirement age: {retirement_age}, "
+          f"expected retirement years: {horizons.mean():.1f} (max {max_retirement_years})")
+    print(f"Assumed mu={mu:.2%}, sigma={sigma:.2%}, inflation AR(1) mean={inflation:.2%}, "
+          f"phi={inflation_phi:.2f}, sigma={inflation_sigma:.2%}, corr={return_inflation_corr:+.2f}")
+    print(f"Realised mean inflation in retirement: {inflation_paths[:, years_to_retirement:].mean():.2%}")
+else:
+    print(f"Years to retirement: {years_to_retirement}, retirement years: {retirement_years}")
+    print(f"Assumed mu={mu:.2%}, sigma={sigma:.2%}, inflation={inflation:.2%}")
 print()
 print(f"Probability of success (not ruined during retirement): {success_rate:.2%}")
-print(f"Mean final balance after {years_total} years: {mean_final:,.2f}")
-print(f"Median final balance: {median_final:,.2f}")
-print(f"5th percentile: {p5:,.2f}")
-print(f"1st percentile: {p1:,.2f}")
-print(f"95th percentile: {p95:,.2f}")
+if engine_mode == "stochastic":
+    print(f"Mortality-weighted probability of success: "
+          f"{mortality_weighted_success(ruin_years, horizon_pmf):.2%}")
+# In stochastic mode each path's balance is frozen at the retiree's sampled death
+if engine_mode == "stochastic":
+    balance_label = "balance at death (bequest)"
+else:
+    balance_label = f"final balance after {years_total} years"
+print(f"Mean {balance_label}: {mean_final:,.2f}")
+print(f"Median {balance_label}: {median_final:,.2f}")
+print(f"5th percentile of {balance_label}: {p5:,.2f}")
+print(f"1st percentile of {balance_label}: {p1:,.2f}")
+print(f"95th percentile of {balance_label}: {p95:,.2f}")
 print(f"Number of ruined sims: {ruin_flags.sum()}")
 
 # Basic ruin-year distribution (for those that ruined)
-ruin_years_arr = np.array([y for y in ruin_years if not np.isnan(y)])
+ruin_years_arr = ruin_years[ruin_flags]
 if ruin_years_arr.size > 0:
     print(f"Earliest ruin year: {int(np.nanmin(ruin_years_arr))}")
     print(f"Median ruin year: {int(np.nanmedian(ruin_years_arr))}")
@@ -130,34 +260,36 @@ if ruin_years_arr.size > 0:
 # -------------------------
 # Plots
 # -------------------------
-plt.figure(figsize=(10,6))
-for path in sample_paths:
-    plt.plot(path, alpha=0.6)
-plt.title("Sample portfolio trajectories (first {} sims)".format(plot_sample_paths))
-plt.xlabel("Year")
-plt.ylabel("Nominal portfolio value")
-plt.grid(True)
-plt.axvline(years_to_retirement, color='k', linestyle='--', label='Retirement start')
-plt.legend([f"Sample path (n={len(sample_paths)})", "Retirement start"], loc='upper left')
-plt.show()
+fan = FanChartAccumulator(years_total + 1)
+fan.update(balances_all)
+
+fig, ax = plt.subplots(figsize=(10,6))
+fan_chart(ax, np.arange(years_total + 1), fan.percentiles(), label='Median path')
+ax.set_title(f"Portfolio trajectories (percentile fan, {num_simulations} sims)")
+ax.set_xlabel("Year")
+ax.set_ylabel("Nominal portfolio value")
+ax.grid(True)
+ax.axvline(years_to_retirement, color='k', linestyle='--', label='Retirement start')
+ax.legend(loc='upper left')
+finish_figure(fig, "retirement_paths_fan")
 
-plt.figure(figsize=(8,5))
+fig = plt.figure(figsize=(8,5))
 plt.hist(all_final_balances, bins=60, edgecolor='k')
-plt.title("Histogram of final portfolio balances")
-plt.xlabel("Final portfolio value (nominal)")
+plt.title(f"Histogram of portfolio {balance_label}")
+plt.xlabel(f"Portfolio {balance_label} (nominal)")
 plt.ylabel("Frequency")
 plt.axvline(p5, color='red', linestyle='--', label=f'5th pct: {p5:.0f}')
 plt.axvline(median_final, color='black', linestyle='-', label=f'median: {median_final:.0f}')
 plt.legend()
 plt.grid(True)
-plt.show()
+finish_figure(fig, "retirement_final_balances")
 
 # Ruin year histogram
 if ruin_years_arr.size > 0:
-    plt.figure(figsize=(8,4))
-    plt.hist(ruin_years_arr - years_to_retirement, bins=range(0, retirement_years+2), edgecolor='k')
+    fig = plt.figure(figsize=(8,4))
+    plt.hist(ruin_years_arr - years_to_retirement, bins=range(0, max_retirement_years+2), edgecolor='k')
     plt.title("Ruin occurrences by retirement-year (years since retirement start)")
     plt.xlabel("Years since retirement start")
     plt.ylabel("Number of simulations that ruined in that year")
     plt.grid(True)
-    plt.show()
+    finish_figure(fig, "retirement_ruin_years")
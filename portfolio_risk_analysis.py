@@ -1,4 +1,5 @@
 import numpy as np
+from sim_plotting import finish_figure
 import matplotlib.pyplot as plt
 
 # --- Portfolio parameters ---
@@ -72,7 +73,7 @@ print(f"Sharpe Ratio: {sharpe_ratio:.2f}")
 print(f"Max Drawdown: {max_drawdown:.2%}")
 
 # --- Plot ---
-plt.figure(figsize=(10, 6))
+fig = plt.figure(figsize=(10, 6))
 plt.hist(portfolio_end_values, bins=50, color='lightblue', edgecolor='black')
 plt.axvline(p5, color='r', linestyle='--', label=f'5% percentile (₵{p5:.2f})')
 plt.axvline(mean_final, color='k', linestyle='-', label=f'Mean (₵{mean_final:.2f})')
@@ -81,4 +82,4 @@ plt.xlabel("Final Portfolio Value")
 plt.ylabel("Frequency")
 plt.legend()
 plt.grid(True)
-plt.show()
+finish_figure(fig, "portfolio_risk_end_values")
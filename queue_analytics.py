@@ -0,0 +1,86 @@
+# queue_analytics.py
+#
+# Closed-form steady-state results for the M/M/c queue (Poisson arrivals, exponential
+# service, c identical servers, FIFO) via the Erlang-C formula, plus the M/G/1 mean wait.
+#   arrival_rate: customers per minute, service_time: mean minutes per customer
+import math
+
+
+def erlang_c(servers, offered_load):
+    """
+    Probability that an arriving customer has to wait, for `servers` servers and offered
+    load a = arrival_rate * service_time (Erlangs). Returns 1.0 when the queue is unstable.
+    """
+    if servers <= 0 or offered_load >= servers:
+        return 1.0
+    if offered_load <= 0:
+        return 0.0
+    # Erlang-B by the stable recursion, then convert to Erlang-C
+    erlang_b = 1.0
+    for k in range(1, servers + 1):
+        erlang_b = offered_load * erlang_b / (k + offered_load * erlang_b)
+    rho = offered_load / servers
+    return erlang_b / (1.0 - rho + rho * erlang_b)
+
+
+def mmc_wait_percentile(servers, arrival_rate, service_time, percentile):
+    """
+    Waiting-time percentile (minutes) in steady state:
+      P(Wq > t) = C * exp(-(c * mu - lambda) * t)
+    Returns math.inf when the queue is unstable.
+    """
+    a = arrival_rate * service_time
+    if servers <= a:
+        return math.inf
+    p_wait = erlang_c(servers, a)
+    tail = 1.0 - percentile / 100.0
+    if p_wait <= tail:
+        return 0.0
+    decay = servers / service_time - arrival_rate
+    return math.log(p_wait / tail) / decay
+
+
+def min_servers_for_wait(arrival_rate, service_time, target_wait, percentile=95, max_servers=1000):
+    """Smallest c whose steady-state waiting-time percentile is at most target_wait."""
+    c = max(1, math.floor(arrival_rate * service_time) + 1)
+    while c <= max_servers:
+        if mmc_wait_percentile(c, arrival_rate, service_time, percentile) <= target_wait:
+            return c
+        c += 1
+    return max_servers
+
+
+def mmc_metrics(servers, arrival_rate, service_time):
+    """
+    Steady-state M/M/c metrics, named like bank_queue_simulation.summarize_run():
+      p_wait            = C(c, a)
+      mean_wait         = C / (c * mu - lambda)
+      mean_queue_length = lambda * mean_wait  (Little's law)
+      utilization       = a / c
+    Waits are math.inf when the queue is unstable.
+    """
+    a = arrival_rate * service_time
+    if servers <= a:
+        return {"p_wait": 1.0, "mean_wait": math.inf, "p90_wait": math.inf, "p95_wait": math.inf,
+                "utilization": 1.0, "mean_queue_length": math.inf}
+    p_wait = erlang_c(servers, a)
+    mean_wait = p_wait / (servers / service_time - arrival_rate)
+    return {
+        "p_wait": p_wait,
+        "mean_wait": mean_wait,
+        "p90_wait": mmc_wait_percentile(servers, arrival_rate, service_time, 90),
+        "p95_wait": mmc_wait_percentile(servers, arrival_rate, service_time, 95),
+        "utilization": a / servers,
+        "mean_queue_length": arrival_rate * mean_wait,
+    }
+
+
+def mg1_mean_wait(arrival_rate, service_time, service_scv):
+    """
+    Pollaczek-Khinchine mean wait for one server with any service distribution of
+    squared coefficient of variation service_scv (1 for exponential, 0 for deterministic).
+    """
+    rho = arrival_rate * service_time
+    if rho >= 1:
+        return math.inf
+    return rho * service_time * (1.0 + service_scv) / (2.0 * (1.0 - rho))
@@ -0,0 +1,236 @@
+# sim_plotting.py
+#
+# Shared plotting helpers for the simulation scripts. Everything here draws a
+# bounded amount of data, so rendering time does not grow with the number of
+# simulated paths or points:
+#   - FanChartAccumulator: streamed per-step percentiles -> fan chart
+#   - lttb / minmax_decimate: downsample long series before plotting
+#   - RasterAccumulator / density_image: 2D histogram raster for point clouds
+#   - finish_figure: saves PNG/SVG under the Agg backend instead of blocking on plt.show()
+#
+# Set SIM_PLOT_DIR to save figures somewhere other than ./plots, and SIM_HEADLESS=1
+# to force the non-interactive backend on a machine that does have a display.
+import os
+import sys
+
+import matplotlib
+import numpy as np
+
+PLOT_DIR = os.getenv("SIM_PLOT_DIR", "plots")
+
+
+def _is_headless():
+    if os.getenv("SIM_HEADLESS", "").lower() in ("1", "true", "yes"):
+        return True
+    return sys.platform.startswith("linux") and not (os.getenv("DISPLAY") or os.getenv("WAYLAND_DISPLAY"))
+
+
+# Pick the backend before pyplot is imported anywhere that uses this module
+if _is_headless():
+    matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+from matplotlib.colors import LogNorm  # noqa: E402
+
+
+# -------------------------
+# Output
+# -------------------------
+def is_interactive():
+    return matplotlib.get_backend().lower() not in ("agg", "pdf", "ps", "svg", "cairo", "template")
+
+
+def finish_figure(fig, filename, formats=("png",), show=None, dpi=120):
+    """
+    Saves the figure as PLOT_DIR/<filename>.<fmt> for every format when running
+    headless (or when show=False), otherwise shows it interactively.
+
+    Returns:
+      list of written file paths (empty if the figure was only shown)
+    """
+    if show is None:
+        show = is_interactive()
+    if show:
+        plt.show()
+        return []
+
+    os.makedirs(PLOT_DIR, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        path = os.path.join(PLOT_DIR, f"{filename}.{fmt}")
+        fig.savefig(path, dpi=dpi, bbox_inches="tight")
+        paths.append(path)
+    plt.close(fig)
+    print(f"Saved plot: {', '.join(paths)}")
+    return paths
+
+
+# -------------------------
+# Fan charts from streamed statistics
+# -------------------------
+class FanChartAccumulator:
+    """
+    Streams batches of paths (shape (batch, num_steps)) into fixed-size per-step
+    histograms, so percentiles over millions of paths cost O(num_steps * num_bins)
+    memory. The value range is taken from the first batch (padded); later values
+    outside it are clipped into the edge bins.
+    """
+
+    def __init__(self, num_steps, num_bins=1024, value_range=None, padding=0.5):
+        self.num_steps = num_steps
+        self.num_bins = num_bins
+        self.padding = padding
+        self.counts = np.zeros((num_steps, num_bins), dtype=np.int64)
+        self.sums = np.zeros(num_steps)
+        self.n_paths = 0
+        self.lo = self.hi = None
+        if value_range is not None:
+            self._set_range(np.full(num_steps, value_range[0], dtype=float),
+                            np.full(num_steps, value_range[1], dtype=float))
+
+    def _set_range(self, lo, hi):
+        hi = np.where(hi > lo, hi, lo + 1.0)
+        self.lo = lo
+        self.hi = hi
+        self.width = (hi - lo) / self.num_bins
+
+    def update(self, paths):
+        paths = np.asarray(paths, dtype=float)
+        if paths.ndim == 1:
+            paths = paths[None, :]
+        if self.lo is None:
+            lo, hi = paths.min(axis=0), paths.max(axis=0)
+            pad = (hi - lo) * self.padding
+            self._set_range(lo - pad, hi + pad)
+
+        bins = ((paths - self.lo) / self.width).astype(np.int64)
+        np.clip(bins, 0, self.num_bins - 1, out=bins)
+        flat = bins + np.arange(self.num_steps) * self.num_bins
+        self.counts += np.bincount(flat.ravel(), minlength=self.num_steps * self.num_bins).reshape(
+            self.num_steps, self.num_bins)
+        self.sums += paths.sum(axis=0)
+        self.n_paths += len(paths)
+
+    def mean(self):
+        return self.sums / max(self.n_paths, 1)
+
+    def percentiles(self, qs=(5, 25, 50, 75, 95)):
+        """
+        Returns {q: array of length num_steps}, interpolated inside the histogram bins.
+        """
+        cdf = np.cumsum(self.counts, axis=1) / max(self.n_paths, 1)
+        result = {}
+        for q in qs:
+            idx = np.argmax(cdf >= q / 100.0, axis=1)
+            prev = np.where(idx > 0, cdf[np.arange(self.num_steps), idx - 1], 0.0)
+            cur = cdf[np.arange(self.num_steps), idx]
+            frac = np.where(cur > prev, (q / 100.0 - prev) / np.where(cur > prev, cur - prev, 1.0), 0.5)
+            result[q] = self.lo + (idx + frac) * self.width
+        return result
+
+
+def fan_chart(ax, x, percentiles, mean=None, color="tab:blue", label="Median"):
+    """
+    Draws nested percentile bands (outer pairs lighter) and the median line.
+    `percentiles` is {q: series}, e.g. from FanChartAccumulator.percentiles().
+    """
+    qs = sorted(percentiles)
+    lower = [q for q in qs if q < 50]
+    for i, q in enumerate(lower):
+        upper = 100 - q
+        if upper in percentiles:
+            alpha = 0.15 + 0.2 * i / max(len(lower), 1)
+            ax.fill_between(x, percentiles[q], percentiles[upper], color=color, alpha=alpha,
+                            linewidth=0, label=f"{q}-{upper}th pct")
+    if 50 in percentiles:
+        ax.plot(x, percentiles[50], color=color, linewidth=1.5, label=label)
+    if mean is not None:
+        ax.plot(x, mean, color="black", linewidth=1.5, linestyle="--", label="Mean")
+    return ax
+
+
+# -------------------------
+# Series decimation
+# -------------------------
+def minmax_decimate(x, y, n_buckets):
+    """
+    Keeps the min and max of y in each of n_buckets equal-count buckets, in x order.
+    Preserves spikes, which LTTB can smooth over.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return x, y
+    size = n // n_buckets
+    usable = size * n_buckets
+    blocks = y[:usable].reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    lo = offsets + blocks.argmin(axis=1)
+    hi = offsets + blocks.argmax(axis=1)
+    idx = np.sort(np.concatenate([lo, hi, np.arange(usable, n)]))
+    return x[idx], y[idx]
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling to n_out points (first and last kept).
+    Loops over the n_out buckets only; work inside a bucket is vectorized.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        nxt_start, nxt_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_start:nxt_end].mean()
+        avg_y = y[nxt_start:nxt_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+# -------------------------
+# Point-cloud rasterization
+# -------------------------
+class RasterAccumulator:
+    """
+    Fixed-resolution 2D count grid over `extent` = (xmin, xmax, ymin, ymax).
+    Chunks of points are binned with bincount, so any number of points renders
+    as one image of resolution x resolution pixels.
+    """
+
+    def __init__(self, extent, resolution=512):
+        self.extent = extent
+        self.resolution = resolution
+        self.counts = np.zeros((resolution, resolution), dtype=np.int64)
+
+    def update(self, x, y):
+        xmin, xmax, ymin, ymax = self.extent
+        res = self.resolution
+        ix = ((np.asarray(x) - xmin) * (res / (xmax - xmin))).astype(np.int64)
+        iy = ((np.asarray(y) - ymin) * (res / (ymax - ymin))).astype(np.int64)
+        inside = (ix >= 0) & (ix < res) & (iy >= 0) & (iy < res)
+        flat = iy[inside] * res + ix[inside]
+        self.counts += np.bincount(flat, minlength=res * res).reshape(res, res)
+
+
+def density_image(ax, counts, extent, cmap="viridis", log=True):
+    """
+    Draws a count grid (rows = y) as an image; log colour scale by default.
+    """
+    counts = np.asarray(counts)
+    norm = LogNorm(vmin=1, vmax=max(counts.max(), 1)) if log else None
+    masked = np.ma.masked_equal(counts, 0) if log else counts
+    image = ax.imshow(masked, origin="lower", extent=extent, cmap=cmap, norm=norm,
+                      aspect="auto", interpolation="nearest")
+    return image
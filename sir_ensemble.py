@@ -0,0 +1,101 @@
+# sir_ensemble.py
+#
+# Batched SIR solver: many (beta, gamma, population, I0) scenarios advance together,
+# one vectorized update per day, using the same daily update as virus_spread_simulation.py.
+from collections import namedtuple
+
+import numpy as np
+
+EnsembleResult = namedtuple("EnsembleResult", ["S", "I", "R", "peak_infections", "peak_day", "final_size"])
+
+
+def parameter_grid(betas, gammas, populations, initial_infected):
+    """
+    Cartesian product of the parameter lists, flattened to one scenario per row.
+
+    Returns:
+      beta, gamma, population, I0: 1-D arrays of length len(betas)*len(gammas)*...
+    """
+    grids = np.meshgrid(np.asarray(betas, dtype=float), np.asarray(gammas, dtype=float),
+                        np.asarray(populations, dtype=float), np.asarray(initial_infected, dtype=float),
+                        indexing="ij")
+    return tuple(g.ravel() for g in grids)
+
+
+def simulate_ensemble(beta, gamma, population, I0, days, R0=0.0, store_series=True, dtype=np.float64):
+    """
+    Advances every scenario together for `days` days (day 0 is the initial state).
+    Scalars broadcast against arrays, so a single population or I0 can be shared.
+
+    Returns:
+      EnsembleResult with S, I, R of shape (n_scenarios, days) (None if store_series is False),
+      and per-scenario peak_infections, peak_day and final_size (total ever infected).
+    """
+    beta, gamma, population, I0, R0 = (np.array(v, dtype=dtype).ravel() for v in np.broadcast_arrays(
+        *(np.asarray(v, dtype=dtype) for v in (beta, gamma, population, I0, R0))))
+    n = beta.size
+
+    S_t = population - I0 - R0
+    I_t = I0.copy()
+    R_t = R0.copy()
+    inv_population = 1.0 / population
+
+    if store_series:
+        S = np.empty((n, days), dtype=dtype)
+        I = np.empty((n, days), dtype=dtype)
+        R = np.empty((n, days), dtype=dtype)
+        S[:, 0], I[:, 0], R[:, 0] = S_t, I_t, R_t
+    else:
+        S = I = R = None
+
+    peak_infections = I_t.copy()
+    peak_day = np.zeros(n, dtype=np.int32)
+    new_infections = np.empty(n, dtype=dtype)
+    new_recoveries = np.empty(n, dtype=dtype)
+
+    for day in range(1, days):
+        # new_infections = beta * S * I / population, computed in place
+        np.multiply(beta, S_t, out=new_infections)
+        new_infections *= I_t
+        new_infections *= inv_population
+        np.multiply(gamma, I_t, out=new_recoveries)
+
+        S_t -= new_infections
+        I_t += new_infections
+        I_t -= new_recoveries
+        R_t += new_recoveries
+
+        higher = I_t > peak_infections
+        peak_infections[higher] = I_t[higher]
+        peak_day[higher] = day
+
+        if store_series:
+            S[:, day], I[:, day], R[:, day] = S_t, I_t, R_t
+
+    final_size = population - S_t
+    return EnsembleResult(S, I, R, peak_infections, peak_day, final_size)
+
+
+def sweep(beta, gamma, population, I0, days, chunk_size=250_000, R0=0.0):
+    """
+    Runs a large scenario sweep in chunks without keeping the daily series,
+    so memory stays O(chunk_size) however many scenarios there are.
+
+    Returns:
+      peak_infections, peak_day, final_size arrays, one entry per scenario.
+    """
+    beta, gamma, population, I0, R0 = (np.atleast_1d(v).ravel() for v in
+                                       np.broadcast_arrays(beta, gamma, population, I0, R0))
+    n = len(beta)
+    peak_infections = np.empty(n)
+    peak_day = np.empty(n, dtype=np.int32)
+    final_size = np.empty(n)
+
+    for start in range(0, n, chunk_size):
+        sl = slice(start, start + chunk_size)
+        result = simulate_ensemble(beta[sl], gamma[sl], population[sl], I0[sl], days, R0=R0[sl],
+                                   store_series=False)
+        peak_infections[sl] = result.peak_infections
+        peak_day[sl] = result.peak_day
+        final_size[sl] = result.final_size
+    return peak_infections, peak_day, final_size
@@ -0,0 +1,139 @@
+# sir_metapopulation.py
+#
+# Metapopulation SIR: many regions, each with its own S/I/R compartments and parameters,
+# coupled by a sparse mobility matrix M where M[i, j] is the share of region i's residents
+# who spend the day in region j (rows sum to 1, the diagonal is "stays home").
+#
+# Each day, with all regions in one (3, n_regions) state array:
+#   infected present in j    = (M^T I)_j / (M^T N)_j
+#   force of infection on i  = sum_j M[i, j] * beta_j * (infected present in j)
+# i.e. two sparse products per day. The daily state can be streamed to a float32 .npy
+# file on disk (readable later with np.load(path, mmap_mode="r")) instead of Python lists.
+from collections import namedtuple
+
+import numpy as np
+import scipy.sparse as sp
+
+Regions = namedtuple("Regions", ["names", "population", "beta", "gamma", "I0"])
+MetapopulationResult = namedtuple("MetapopulationResult",
+                                  ["S_total", "I_total", "R_total", "peak_day", "peak_infected", "final_size"])
+
+
+# -------------------------
+# Inputs
+# -------------------------
+def load_regions(path):
+    """
+    Reads a CSV with columns "region,population,beta,gamma,I0".
+    """
+    table = np.genfromtxt(path, delimiter=",", names=True, dtype=None, encoding="utf-8")
+    def column(name):
+        return np.atleast_1d(table[name])
+
+    return Regions(column("region").astype(str), column("population").astype(float),
+                   column("beta").astype(float), column("gamma").astype(float), column("I0").astype(float))
+
+
+def load_mobility(path, region_names):
+    """
+    Reads a CSV with columns "origin,destination,fraction" (region names) and returns the
+    row-normalised CSR mobility matrix; whatever share is not listed stays home.
+    """
+    table = np.genfromtxt(path, delimiter=",", names=True, dtype=None, encoding="utf-8")
+    index = {name: i for i, name in enumerate(region_names)}
+    origin = np.array([index[o] for o in np.atleast_1d(table["origin"]).astype(str)])
+    destination = np.array([index[d] for d in np.atleast_1d(table["destination"]).astype(str)])
+    return mobility_matrix(origin, destination, np.atleast_1d(table["fraction"]).astype(float),
+                           len(region_names))
+
+
+def mobility_matrix(origin, destination, fraction, n_regions):
+    """
+    Builds M from off-diagonal travel shares and adds the stay-home diagonal.
+    """
+    off = origin != destination
+    travel = sp.csr_matrix((fraction[off], (origin[off], destination[off])), shape=(n_regions, n_regions))
+    away = np.asarray(travel.sum(axis=1)).ravel()
+    if np.any(away > 1.0 + 1e-9):
+        raise ValueError("Travel shares out of a region add up to more than 1")
+    return (travel + sp.diags(1.0 - away)).tocsr()
+
+
+def synthetic_regions(n_regions, neighbours=8, travel_share=0.1, seed=None):
+    """
+    Random test case: lognormal populations, each region sending `travel_share` of its
+    residents to `neighbours` random other regions; one seeded region.
+
+    Returns:
+      Regions, CSR mobility matrix
+    """
+    rng = np.random.default_rng(seed)
+    population = np.round(rng.lognormal(np.log(50_000), 1.0, n_regions)) + 100
+    beta = rng.uniform(0.2, 0.4, n_regions)
+    gamma = np.full(n_regions, 0.1)
+    I0 = np.zeros(n_regions)
+    I0[rng.integers(n_regions)] = 10
+    names = np.array([f"R{i}" for i in range(n_regions)])
+
+    origin = np.repeat(np.arange(n_regions), neighbours)
+    destination = rng.integers(0, n_regions, size=origin.size)
+    fraction = rng.dirichlet(np.ones(neighbours), size=n_regions).ravel() * travel_share
+    return Regions(names, population, beta, gamma, I0), mobility_matrix(origin, destination, fraction, n_regions)
+
+
+# -------------------------
+# Simulation
+# -------------------------
+def simulate_metapopulation(regions, mobility, days, output_path=None):
+    """
+    Daily update of every region at once (same forward step as virus_spread_simulation.py).
+
+    Returns:
+      MetapopulationResult with national daily totals and per-region peak_day,
+      peak_infected and final_size. If output_path is given, the full (days, 3, n_regions)
+      float32 state is streamed to that .npy file.
+    """
+    n = len(regions.population)
+    population = regions.population
+    state = np.empty((3, n))
+    state[0] = population - regions.I0
+    state[1] = regions.I0
+    state[2] = 0.0
+    S, I, R = state  # views into the state array
+
+    mobility_t = mobility.T.tocsr()
+    present_population = mobility_t @ population
+    present_population[present_population == 0] = 1.0
+
+    out = None
+    if output_path:
+        out = np.lib.format.open_memmap(output_path, mode="w+", dtype=np.float32, shape=(days, 3, n))
+        out[0] = state
+
+    totals = np.zeros((3, days))
+    totals[:, 0] = state.sum(axis=1)
+    peak_infected = I.copy()
+    peak_day = np.zeros(n, dtype=np.int32)
+
+    for day in range(1, days):
+        prevalence_present = (mobility_t @ I) / present_population
+        force = mobility @ (regions.beta * prevalence_present)
+        new_infections = force * S
+        new_recoveries = regions.gamma * I
+
+        S -= new_infections
+        I += new_infections - new_recoveries
+        R += new_recoveries
+
+        higher = I > peak_infected
+        peak_infected[higher] = I[higher]
+        peak_day[higher] = day
+        totals[:, day] = state.sum(axis=1)
+        if out is not None:
+            out[day] = state
+
+    if out is not None:
+        out.flush()
+        del out
+
+    return MetapopulationResult(totals[0], totals[1], totals[2], peak_day, peak_infected, population - S)
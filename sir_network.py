@@ -0,0 +1,175 @@
+# sir_network.py
+#
+# SIR on a contact network instead of a well-mixed population.
+# The graph is a scipy.sparse CSR adjacency matrix; each day the number of infected
+# neighbours of every node is one sparse mat-vec, and node states are updated with
+# boolean masks over an int8 state array (0 = S, 1 = I, 2 = R).
+#
+# Memory is dominated by the adjacency: about 8 bytes per directed edge
+# (int32 column index + float32 weight), i.e. ~1.6 GB for 100M undirected edges.
+from collections import namedtuple
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+try:
+    import resource  # Unix only, used for peak-memory reporting
+except ImportError:
+    resource = None
+
+SUSCEPTIBLE, INFECTED, RECOVERED = 0, 1, 2
+
+NetworkResult = namedtuple("NetworkResult", ["S", "I", "R", "peak_day", "final_size", "state"])
+
+
+# -------------------------
+# Graph input
+# -------------------------
+def load_edge_list(path, delimiter=","):
+    """
+    Reads an edge list: a .npy file holding a (2, E) integer array, or a text file
+    with one "src<delimiter>dst" pair per line ('#' comments allowed).
+
+    Returns:
+      src, dst: int32 arrays
+    """
+    if path.endswith(".npy"):
+        edges = np.load(path, mmap_mode="r")
+        return np.asarray(edges[0], dtype=np.int32), np.asarray(edges[1], dtype=np.int32)
+
+    import pandas as pd
+    edges = pd.read_csv(path, sep=delimiter, header=None, comment="#", dtype=np.int32, usecols=[0, 1])
+    return edges[0].to_numpy(), edges[1].to_numpy()
+
+
+def build_adjacency(src, dst, num_nodes=None, undirected=True):
+    """
+    Builds a CSR adjacency matrix (float32 weights, duplicate edges summed).
+    Self-loops are dropped; undirected graphs store each edge in both directions.
+    """
+    src = np.asarray(src, dtype=np.int32)
+    dst = np.asarray(dst, dtype=np.int32)
+    keep = src != dst
+    src, dst = src[keep], dst[keep]
+    if num_nodes is None:
+        num_nodes = int(max(src.max(), dst.max())) + 1 if src.size else 0
+    if undirected:
+        src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+
+    weights = np.ones(src.size, dtype=np.float32)
+    adjacency = sp.csr_matrix((weights, (src, dst)), shape=(num_nodes, num_nodes), dtype=np.float32)
+    adjacency.sum_duplicates()
+    return adjacency
+
+
+# -------------------------
+# Synthetic graphs for benchmarking
+# -------------------------
+def synthetic_graph(num_nodes, mean_degree, kind="erdos_renyi", exponent=2.5, seed=None):
+    """
+    Random undirected graph with the given mean degree.
+      kind="erdos_renyi": endpoints uniform over nodes
+      kind="power_law":   Chung-Lu graph, expected degrees ~ power law with `exponent`
+
+    Returns:
+      CSR adjacency matrix
+    """
+    rng = np.random.default_rng(seed)
+    num_edges = int(num_nodes * mean_degree / 2)
+
+    if kind == "erdos_renyi":
+        src = rng.integers(0, num_nodes, size=num_edges, dtype=np.int32)
+        dst = rng.integers(0, num_nodes, size=num_edges, dtype=np.int32)
+    elif kind == "power_law":
+        # Node weights w_i ~ i^(-1/(exponent-1)); endpoints drawn proportional to weight
+        weights = np.arange(1, num_nodes + 1, dtype=np.float64) ** (-1.0 / (exponent - 1.0))
+        cumulative = np.cumsum(weights)
+        cumulative /= cumulative[-1]
+        src = np.searchsorted(cumulative, rng.random(num_edges)).astype(np.int32)
+        dst = np.searchsorted(cumulative, rng.random(num_edges)).astype(np.int32)
+        # Shuffle labels so hubs are not all at low indices
+        labels = rng.permutation(num_nodes).astype(np.int32)
+        src, dst = labels[src], labels[dst]
+    else:
+        raise ValueError(f"Unknown graph kind {kind!r}; use 'erdos_renyi' or 'power_law'")
+
+    return build_adjacency(src, dst, num_nodes)
+
+
+# -------------------------
+# Simulation
+# -------------------------
+def simulate_network(adjacency, transmission_prob, gamma, I0, days, seed=None, initial_infected=None):
+    """
+    Discrete-day network SIR. Each day a susceptible node with k infected neighbours
+    is infected with probability 1 - (1 - transmission_prob)^k, and each infected
+    node recovers with probability gamma.
+
+    Returns:
+      NetworkResult with daily S, I, R counts (length `days`), peak_day, final_size
+      (total ever infected) and the final node state array.
+    """
+    rng = np.random.default_rng(seed)
+    n = adjacency.shape[0]
+    state = np.zeros(n, dtype=np.int8)
+    if initial_infected is None:
+        initial_infected = rng.choice(n, size=I0, replace=False)
+    state[initial_infected] = INFECTED
+
+    log_escape = np.log1p(-transmission_prob)
+    infected_indicator = np.zeros(n, dtype=np.float32)
+    S = np.zeros(days, dtype=np.int64)
+    I = np.zeros(days, dtype=np.int64)
+    R = np.zeros(days, dtype=np.int64)
+
+    for day in range(days):
+        infected = state == INFECTED
+        n_infected = int(np.count_nonzero(infected))
+        I[day] = n_infected
+        R[day] = np.count_nonzero(state == RECOVERED)
+        S[day] = n - I[day] - R[day]
+        if n_infected == 0:
+            S[day:], R[day:] = S[day], R[day]  # epidemic over; I stays zero
+            break
+        if day == days - 1:
+            break
+
+        # Infection pressure: number of infected neighbours of every node
+        np.copyto(infected_indicator, infected)
+        pressure = adjacency @ infected_indicator
+
+        at_risk = np.flatnonzero((pressure > 0) & (state == SUSCEPTIBLE))
+        p_infect = -np.expm1(log_escape * pressure[at_risk])
+        newly_infected = at_risk[rng.random(at_risk.size) < p_infect]
+
+        infected_idx = np.flatnonzero(infected)
+        recovering = infected_idx[rng.random(infected_idx.size) < gamma]
+
+        state[newly_infected] = INFECTED
+        state[recovering] = RECOVERED
+
+    final_size = n - int(np.count_nonzero(state == SUSCEPTIBLE))
+    return NetworkResult(S, I, R, int(I.argmax()), final_size, state)
+
+
+def benchmark(num_nodes=1_000_000, mean_degree=10, days=160, transmission_prob=0.05, gamma=0.1,
+              I0=10, kind="erdos_renyi", seed=42):
+    """
+    Builds a synthetic graph, runs one epidemic and prints timings and peak memory.
+    """
+    start = time.perf_counter()
+    adjacency = synthetic_graph(num_nodes, mean_degree, kind=kind, seed=seed)
+    built = time.perf_counter()
+    result = simulate_network(adjacency, transmission_prob, gamma, I0, days, seed=seed)
+    done = time.perf_counter()
+
+    graph_mb = (adjacency.data.nbytes + adjacency.indices.nbytes + adjacency.indptr.nbytes) / 1e6
+    print(f"Graph: {num_nodes:,} nodes, {adjacency.nnz // 2:,} edges ({kind}), {graph_mb:,.0f} MB, "
+          f"built in {built - start:.1f} s")
+    print(f"Epidemic: {days} days in {done - built:.1f} s ({(done - built) / days * 1000:.0f} ms/day)")
+    print(f"Peak infected {result.I.max():,} on day {result.peak_day}, "
+          f"final size {result.final_size:,} ({result.final_size / num_nodes:.1%})")
+    if resource is not None:
+        print(f"Peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB")  # kB on Linux
+    return result
@@ -0,0 +1,130 @@
+# sir_ode.py
+#
+# Continuous-time SIR solved with scipy.integrate.solve_ivp (analytic Jacobian, adaptive
+# step), plus least-squares calibration of beta / gamma / I0 to observed daily case counts.
+#
+#   S' = -beta S I / N,  I' = beta S I / N - gamma I,  R' = gamma I
+#
+# Repeated solves with identical parameters are served from an LRU cache, and multi-start
+# fits run their starts in parallel processes.
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import os
+
+import numpy as np
+from scipy.integrate import solve_ivp
+from scipy.optimize import least_squares
+from scipy.stats import qmc
+
+FitResult = namedtuple("FitResult", ["beta", "gamma", "I0", "cost", "success", "predicted"])
+
+# Default search box for calibration: (beta, gamma, I0 as a share of the population)
+DEFAULT_BOUNDS = ((0.01, 0.05, 1e-7), (3.0, 1.0, 0.05))
+
+
+# -------------------------
+# ODE backend
+# -------------------------
+def sir_rhs(t, y, beta, gamma, population):
+    S, I, R = y
+    infection = beta * S * I / population
+    recovery = gamma * I
+    return [-infection, infection - recovery, recovery]
+
+
+def sir_jacobian(t, y, beta, gamma, population):
+    S, I, R = y
+    b = beta / population
+    return [[-b * I, -b * S, 0.0],
+            [b * I, b * S - gamma, 0.0],
+            [0.0, gamma, 0.0]]
+
+
+@lru_cache(maxsize=4096)
+def _solve_cached(beta, gamma, population, I0, days, method, rtol, atol):
+    y0 = [population - I0, I0, 0.0]
+    solution = solve_ivp(sir_rhs, (0.0, days - 1.0), y0, method=method, t_eval=np.arange(days),
+                         jac=sir_jacobian, args=(beta, gamma, population), rtol=rtol, atol=atol)
+    if not solution.success:
+        raise RuntimeError(f"SIR solve failed for beta={beta}, gamma={gamma}, I0={I0}: {solution.message}")
+    y = solution.y
+    y.setflags(write=False)  # shared by every caller that hits the cache
+    return y[0], y[1], y[2]
+
+
+def solve_sir(beta, gamma, population, I0, days, method="LSODA", rtol=1e-8, atol=1e-6):
+    """
+    Returns:
+      S, I, R: read-only arrays with the state at days 0..days-1
+    """
+    return _solve_cached(float(beta), float(gamma), float(population), float(I0), int(days),
+                         method, rtol, atol)
+
+
+def daily_incidence(beta, gamma, population, I0, days, **solver_options):
+    """
+    New infections per day: incidence[d] = S(d-1) - S(d) for d >= 1 (incidence[0] = 0).
+    """
+    S, _, _ = solve_sir(beta, gamma, population, I0, days, **solver_options)
+    return np.concatenate(([0.0], -np.diff(S)))
+
+
+# -------------------------
+# Calibration
+# -------------------------
+def load_case_counts(path):
+    """
+    Reads a CSV with columns "day,cases" (daily new cases; day 0 = first day of the series).
+
+    Returns:
+      days, cases: int and float arrays
+    """
+    table = np.genfromtxt(path, delimiter=",", names=True)
+    return table["day"].astype(int), table["cases"].astype(float)
+
+
+def _residuals(log_params, obs_days, cases, population, horizon, weights):
+    beta, gamma, i0_share = np.exp(log_params)
+    predicted = daily_incidence(beta, gamma, population, i0_share * population, horizon)
+    return (predicted[obs_days] - cases) * weights
+
+
+def _fit_from_start(args):
+    start, obs_days, cases, population, lower, upper = args
+    horizon = int(obs_days.max()) + 1
+    # Poisson-like weighting so the peak does not dominate the tails
+    weights = 1.0 / np.sqrt(np.maximum(cases, 1.0))
+    result = least_squares(_residuals, np.log(start), bounds=(np.log(lower), np.log(upper)),
+                           args=(obs_days, cases, population, horizon, weights), x_scale="jac")
+    return result.x, result.cost, result.success
+
+
+def fit_sir(obs_days, cases, population, starts=8, bounds=DEFAULT_BOUNDS, workers=None, seed=None):
+    """
+    Fits beta, gamma and I0 to observed daily case counts by weighted least squares,
+    from `starts` Latin-hypercube starting points spread over `bounds` (log scale).
+    Starts run in parallel processes; the lowest-cost fit wins.
+    """
+    obs_days = np.asarray(obs_days, dtype=int)
+    cases = np.asarray(cases, dtype=float)
+    keep = obs_days >= 1  # incidence is defined from day 1
+    obs_days, cases = obs_days[keep], cases[keep]
+    lower, upper = np.asarray(bounds[0], dtype=float), np.asarray(bounds[1], dtype=float)
+
+    unit = qmc.LatinHypercube(d=3, seed=seed).random(starts)
+    start_points = np.exp(np.log(lower) + unit * (np.log(upper) - np.log(lower)))
+    tasks = [(p, obs_days, cases, population, lower, upper) for p in start_points]
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and starts > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, starts)) as pool:
+            fits = list(pool.map(_fit_from_start, tasks))
+    else:
+        fits = [_fit_from_start(task) for task in tasks]
+
+    log_params, cost, success = min(fits, key=lambda fit: fit[1])
+    beta, gamma, i0_share = np.exp(log_params)
+    predicted = daily_incidence(beta, gamma, population, i0_share * population, int(obs_days.max()) + 1)
+    return FitResult(float(beta), float(gamma), float(i0_share * population), float(cost), bool(success),
+                     predicted)
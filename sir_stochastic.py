@@ -0,0 +1,157 @@
+# sir_stochastic.py
+#
+# Stochastic SIR replicates, vectorized across replicates:
+#   - gillespie(): exact event-by-event simulation, for small populations
+#   - tau_leap():  binomial tau-leaping (never goes negative), for millions of people
+# run_replicates() spreads batches of replicates over a process pool.
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+import numpy as np
+
+StochasticResult = namedtuple("StochasticResult", ["daily_I", "final_size", "peak_infections", "peak_day"])
+
+GILLESPIE_MAX_POPULATION = 10_000   # above this, "auto" switches to tau-leaping
+
+
+def _result(daily_I, population, S_final):
+    peak_day = daily_I.argmax(axis=1).astype(np.int32)
+    peak_infections = daily_I.max(axis=1)
+    return StochasticResult(daily_I, population - S_final, peak_infections, peak_day)
+
+
+def gillespie(beta, gamma, population, I0, days, replicates, rng):
+    """
+    Exact stochastic simulation; each loop iteration fires one event in every
+    still-active replicate. Daily prevalence is the state at each integer day.
+    """
+    S = np.full(replicates, population - I0, dtype=np.int64)
+    I = np.full(replicates, I0, dtype=np.int64)
+    t = np.zeros(replicates)
+    next_day = np.ones(replicates, dtype=np.int64)
+    daily_I = np.zeros((replicates, days), dtype=np.int64)
+    daily_I[:, 0] = I0
+    active = I > 0
+
+    while active.any():
+        idx = np.flatnonzero(active)
+        s, i = S[idx], I[idx]
+        rate_inf = beta * s * i / population
+        rate_total = rate_inf + gamma * i
+        t_new = t[idx] + rng.exponential(1.0 / rate_total)
+
+        # Record prevalence for every day boundary crossed before this event
+        crossing = np.flatnonzero(t_new >= next_day[idx])
+        while crossing.size:
+            reps = idx[crossing]
+            day = next_day[reps]
+            inside = day < days
+            daily_I[reps[inside], day[inside]] = i[crossing[inside]]
+            next_day[reps] += 1
+            crossing = crossing[(t_new[crossing] >= next_day[reps]) & inside]
+
+        # Events after the horizon are not applied
+        within = t_new < days
+        infection = rng.random(idx.size) * rate_total < rate_inf
+        fired = idx[within]
+        inf = infection[within]
+        S[fired] -= inf
+        I[fired] += np.where(inf, 1, -1)
+        t[idx] = t_new
+
+        active[idx[~within]] = False
+        active &= I > 0
+
+    # Extinct replicates stay at their final prevalence for the remaining days
+    remaining = np.arange(days)[None, :] >= next_day[:, None]
+    daily_I = np.where(remaining, I[:, None], daily_I)
+    return _result(daily_I, population, S)
+
+
+def tau_leap(beta, gamma, population, I0, days, replicates, rng, tau=0.1):
+    """
+    Binomial tau-leaping: in each step of length tau, each susceptible is infected with
+    probability 1 - exp(-beta * I / N * tau) and each infected recovers with
+    probability 1 - exp(-gamma * tau).
+    """
+    steps_per_day = max(1, int(round(1.0 / tau)))
+    tau = 1.0 / steps_per_day
+    p_recover = 1.0 - np.exp(-gamma * tau)
+
+    S = np.full(replicates, population - I0, dtype=np.int64)
+    I = np.full(replicates, I0, dtype=np.int64)
+    daily_I = np.zeros((replicates, days), dtype=np.int64)
+    daily_I[:, 0] = I0
+
+    for day in range(1, days):
+        for _ in range(steps_per_day):
+            p_infect = -np.expm1(-beta * tau / population * I)
+            new_infections = rng.binomial(S, p_infect)
+            new_recoveries = rng.binomial(I, p_recover)
+            S -= new_infections
+            I += new_infections - new_recoveries
+        daily_I[:, day] = I
+        if not I.any():
+            break  # every replicate extinct; the rest of daily_I is already zero
+
+    return _result(daily_I, population, S)
+
+
+def simulate(beta, gamma, population, I0, days, replicates, method="auto", seed=None, tau=0.1):
+    """
+    Runs `replicates` stochastic replicates in this process.
+    method: "gillespie", "tau_leap" or "auto" (exact for populations up to GILLESPIE_MAX_POPULATION).
+    """
+    rng = np.random.default_rng(seed)
+    if method == "auto":
+        method = "gillespie" if population <= GILLESPIE_MAX_POPULATION else "tau_leap"
+    if method == "gillespie":
+        return gillespie(beta, gamma, population, I0, days, replicates, rng)
+    if method == "tau_leap":
+        return tau_leap(beta, gamma, population, I0, days, replicates, rng, tau=tau)
+    raise ValueError(f"Unknown method {method!r}; use 'gillespie', 'tau_leap' or 'auto'")
+
+
+def _simulate_batch(args):
+    return simulate(*args)
+
+
+def run_replicates(beta, gamma, population, I0, days, replicates, method="auto", seed=None,
+                   tau=0.1, workers=None, batch_size=250):
+    """
+    Splits the replicates into batches with independent seeds and runs them across a
+    process pool. Results are identical for a given seed whatever the worker count.
+    """
+    workers = workers or os.cpu_count() or 1
+    sizes = [min(batch_size, replicates - start) for start in range(0, replicates, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(beta, gamma, population, I0, days, n, method, s, tau) for n, s in zip(sizes, seeds)]
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_batch, tasks))
+    else:
+        results = [_simulate_batch(task) for task in tasks]
+
+    return StochasticResult(*(np.concatenate(parts) for parts in zip(*results)))
+
+
+def summarize(result, population, minor_threshold=0.01, quantiles=(5, 25, 50, 75, 95)):
+    """
+    Returns a dict with the extinction (minor outbreak) probability, outbreak-size quantiles,
+    and peak-day / peak-size quantiles over major outbreaks.
+    Outbreaks infecting less than minor_threshold of the population count as extinct.
+    """
+    attack = result.final_size / population
+    major = attack >= minor_threshold
+    summary = {
+        "replicates": len(attack),
+        "extinction_probability": float(1.0 - major.mean()),
+        "final_size_quantiles": dict(zip(quantiles, np.percentile(result.final_size, quantiles))),
+    }
+    if major.any():
+        summary["peak_day_quantiles"] = dict(zip(quantiles, np.percentile(result.peak_day[major], quantiles)))
+        summary["peak_infections_quantiles"] = dict(
+            zip(quantiles, np.percentile(result.peak_infections[major], quantiles)))
+    return summary
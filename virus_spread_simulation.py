@@ -1,6 +1,19 @@
+import time
+
 import numpy as np
+from sim_plotting import FanChartAccumulator, fan_chart, finish_figure
 import matplotlib.pyplot as plt
 
+# Simulation mode:
+#   "deterministic" -> one (beta, gamma) pair, daily update below
+#   "ensemble"      -> every combination of the grids below, advanced together (sir_ensemble.py)
+#   "stochastic"    -> many random replicates of the same scenario (sir_stochastic.py)
+#   "network"       -> SIR on a sparse contact network (sir_network.py)
+#   "ode"           -> adaptive ODE solve of the same model, compared with the daily update (sir_ode.py)
+#   "calibrate"     -> fit beta / gamma / I0 to daily case counts (sir_ode.py)
+#   "metapopulation"-> many regions coupled by a sparse mobility matrix (sir_metapopulation.py)
+simulation_mode = "deterministic"
+
 # Parameters
 beta = 0.3      # Infection rate
 gamma = 0.1     # Recovery rate
@@ -10,27 +23,273 @@ S0 = population - I0 - R0
 
 # Time steps
 days = 160
-S, I, R = [S0], [I0], [R0]
-
-for day in range(1, days):
-    new_infections = beta * S[-1] * I[-1] / population
-    new_recoveries = gamma * I[-1]
-    
-    S_next = S[-1] - new_infections
-    I_next = I[-1] + new_infections - new_recoveries
-    R_next = R[-1] + new_recoveries
-    
-    S.append(S_next)
-    I.append(I_next)
-    R.append(R_next)
-
-# Visualization
-plt.plot(S, label='Susceptible', color='blue')
-plt.plot(I, label='Infected', color='red')
-plt.plot(R, label='Recovered', color='green')
-plt.xlabel("Days")
-plt.ylabel("Number of People")
-plt.title("Virus Spread Simulation (SIR Model)")
-plt.legend()
-plt.grid(True)
-plt.show()
+
+# Ensemble mode grids (scenarios = product of all four)
+beta_grid = np.linspace(0.1, 0.6, 101)
+gamma_grid = np.linspace(0.05, 0.25, 101)
+population_grid = [1000, 10_000, 100_000]
+I0_grid = [1, 10]
+
+# Stochastic mode
+stochastic_method = "auto"   # "gillespie" (exact), "tau_leap" (binomial), "auto" picks by population
+replicates = 2000
+tau = 0.1                    # tau-leap step in days
+RANDOM_SEED = 42
+
+# Network mode
+network_edge_list = None        # edge-list CSV ("src,dst") or .npy; None builds a synthetic graph
+network_nodes = 1_000_000       # synthetic graph size
+network_mean_degree = 10
+network_graph_kind = "erdos_renyi"   # or "power_law"
+transmission_prob = 0.05        # per infected neighbour per day
+
+# Calibration mode
+case_counts_csv = None          # CSV with columns "day,cases"; None fits synthetic noisy data
+calibration_starts = 8          # multi-start least-squares runs (in parallel)
+
+# Metapopulation mode
+regions_csv = None              # "region,population,beta,gamma,I0"; None builds synthetic regions
+mobility_csv = None             # "origin,destination,fraction" (required with regions_csv)
+synthetic_region_count = 20_000
+metapopulation_output = "metapopulation_states.npy"   # float32 (days, 3, regions); None to skip
+
+
+def simulate_sir():
+    """
+    Returns:
+      S, I, R: lists of length `days` for the single (beta, gamma) scenario.
+    """
+    S, I, R = [S0], [I0], [R0]
+
+    for day in range(1, days):
+        new_infections = beta * S[-1] * I[-1] / population
+        new_recoveries = gamma * I[-1]
+
+        S_next = S[-1] - new_infections
+        I_next = I[-1] + new_infections - new_recoveries
+        R_next = R[-1] + new_recoveries
+
+        S.append(S_next)
+        I.append(I_next)
+        R.append(R_next)
+
+    return S, I, R
+
+
+def run_deterministic():
+    S, I, R = simulate_sir()
+
+    # Visualization
+    fig = plt.figure()
+    plt.plot(S, label='Susceptible', color='blue')
+    plt.plot(I, label='Infected', color='red')
+    plt.plot(R, label='Recovered', color='green')
+    plt.xlabel("Days")
+    plt.ylabel("Number of People")
+    plt.title("Virus Spread Simulation (SIR Model)")
+    plt.legend()
+    plt.grid(True)
+    finish_figure(fig, "virus_spread_sir")
+
+
+def run_ensemble():
+    from sir_ensemble import parameter_grid, sweep
+
+    betas, gammas, populations, initial = parameter_grid(beta_grid, gamma_grid, population_grid, I0_grid)
+    start = time.perf_counter()
+    peak_infections, peak_day, final_size = sweep(betas, gammas, populations, initial, days)
+    elapsed = time.perf_counter() - start
+
+    attack_rate = final_size / populations
+    print("Virus Spread Simulation — Ensemble SIR sweep")
+    print(f"Scenarios: {len(betas):,} x {days} days in {elapsed:.2f} s "
+          f"({len(betas) * days / elapsed:,.0f} scenario-days/s)")
+    print(f"Peak infections (share of population): median {np.median(peak_infections / populations):.2%}, "
+          f"max {np.max(peak_infections / populations):.2%}")
+    print(f"Peak day: median {np.median(peak_day):.0f}, range {peak_day.min()}-{peak_day.max()}")
+    print(f"Final size (attack rate): median {np.median(attack_rate):.2%}")
+
+    # Attack-rate map over (beta, gamma) for the first population / I0 combination
+    shape = (len(beta_grid), len(gamma_grid), len(population_grid), len(I0_grid))
+    attack_map = attack_rate.reshape(shape)[:, :, 0, 0]
+
+    fig, ax = plt.subplots(figsize=(7, 5))
+    image = ax.imshow(attack_map.T, origin="lower", aspect="auto", cmap="magma",
+                      extent=(beta_grid[0], beta_grid[-1], gamma_grid[0], gamma_grid[-1]))
+    fig.colorbar(image, ax=ax, label="Final size / population")
+    ax.set_xlabel("beta (infection rate)")
+    ax.set_ylabel("gamma (recovery rate)")
+    ax.set_title(f"SIR attack rate (population={population_grid[0]}, I0={I0_grid[0]})")
+    finish_figure(fig, "virus_spread_ensemble")
+
+
+def run_stochastic():
+    from sir_stochastic import run_replicates, summarize
+
+    start = time.perf_counter()
+    result = run_replicates(beta, gamma, population, I0, days, replicates,
+                            method=stochastic_method, seed=RANDOM_SEED, tau=tau)
+    elapsed = time.perf_counter() - start
+    summary = summarize(result, population)
+
+    print("Virus Spread Simulation — Stochastic SIR")
+    print(f"Replicates: {replicates:,} ({stochastic_method}) in {elapsed:.2f} s")
+    print(f"Extinction probability (minor outbreak): {summary['extinction_probability']:.2%} "
+          f"(branching-process estimate {min(1.0, gamma / beta) ** I0:.2%})")
+    for q, v in summary["final_size_quantiles"].items():
+        print(f"  Outbreak size P{q}: {v:,.0f}")
+    if "peak_day_quantiles" in summary:
+        for q, v in summary["peak_day_quantiles"].items():
+            print(f"  Peak day P{q} (major outbreaks): {v:.0f}")
+
+    fan = FanChartAccumulator(days)
+    fan.update(result.daily_I)
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+    fan_chart(ax1, np.arange(days), fan.percentiles(), mean=fan.mean(), color="red", label="Median infected")
+    ax1.set_xlabel("Days")
+    ax1.set_ylabel("Infected")
+    ax1.set_title("Infected across replicates")
+    ax1.grid(True)
+    ax1.legend()
+    ax2.hist(result.final_size, bins=60, color="gray", edgecolor="black")
+    ax2.set_xlabel("Total infected (outbreak size)")
+    ax2.set_ylabel("Replicates")
+    ax2.set_title("Outbreak-size distribution")
+    finish_figure(fig, "virus_spread_stochastic")
+
+
+def run_network():
+    from sir_network import build_adjacency, load_edge_list, simulate_network, synthetic_graph
+
+    start = time.perf_counter()
+    if network_edge_list:
+        adjacency = build_adjacency(*load_edge_list(network_edge_list))
+    else:
+        adjacency = synthetic_graph(network_nodes, network_mean_degree, kind=network_graph_kind,
+                                    seed=RANDOM_SEED)
+    built = time.perf_counter()
+    result = simulate_network(adjacency, transmission_prob, gamma, I0, days, seed=RANDOM_SEED)
+    elapsed = time.perf_counter() - built
+
+    n = adjacency.shape[0]
+    print("Virus Spread Simulation — Network SIR")
+    print(f"Graph: {n:,} nodes, {adjacency.nnz // 2:,} edges, built/loaded in {built - start:.1f} s")
+    print(f"Simulated {days} days in {elapsed:.1f} s")
+    print(f"Peak infected: {result.I.max():,} on day {result.peak_day}")
+    print(f"Final size: {result.final_size:,} ({result.final_size / n:.1%})")
+
+    fig = plt.figure()
+    plt.plot(result.S, label='Susceptible', color='blue')
+    plt.plot(result.I, label='Infected', color='red')
+    plt.plot(result.R, label='Recovered', color='green')
+    plt.xlabel("Days")
+    plt.ylabel("Number of People")
+    plt.title(f"Network SIR ({n:,} nodes)")
+    plt.legend()
+    plt.grid(True)
+    finish_figure(fig, "virus_spread_network")
+
+
+def run_ode():
+    from sir_ode import solve_sir
+
+    S_euler, I_euler, R_euler = simulate_sir()
+    S, I, R = solve_sir(beta, gamma, population, I0, days)
+    print("Virus Spread Simulation — ODE backend (solve_ivp, analytic Jacobian)")
+    print(f"Peak infected: ODE {I.max():.1f} on day {I.argmax()}, "
+          f"daily update {max(I_euler):.1f} on day {int(np.argmax(I_euler))}")
+    print(f"Max |I_ode - I_daily|: {np.max(np.abs(I - np.array(I_euler))):.1f}")
+
+    fig = plt.figure()
+    plt.plot(S, label='Susceptible', color='blue')
+    plt.plot(I, label='Infected', color='red')
+    plt.plot(R, label='Recovered', color='green')
+    plt.plot(I_euler, label='Infected (daily update)', color='red', linestyle='--')
+    plt.xlabel("Days")
+    plt.ylabel("Number of People")
+    plt.title("Virus Spread Simulation (SIR ODE)")
+    plt.legend()
+    plt.grid(True)
+    finish_figure(fig, "virus_spread_ode")
+
+
+def run_calibrate():
+    from sir_ode import daily_incidence, fit_sir, load_case_counts
+
+    if case_counts_csv:
+        obs_days, cases = load_case_counts(case_counts_csv)
+        print(f"Loaded {len(cases)} days of case counts from {case_counts_csv}")
+    else:
+        rng = np.random.default_rng(RANDOM_SEED)
+        obs_days = np.arange(days)
+        cases = rng.poisson(daily_incidence(beta, gamma, population, I0, days)).astype(float)
+        print(f"Synthetic case counts from beta={beta}, gamma={gamma}, I0={I0} with Poisson noise")
+
+    start = time.perf_counter()
+    fit = fit_sir(obs_days, cases, population, starts=calibration_starts, seed=RANDOM_SEED)
+    elapsed = time.perf_counter() - start
+
+    print("Virus Spread Simulation — Calibration")
+    print(f"Fitted beta={fit.beta:.4f}, gamma={fit.gamma:.4f}, I0={fit.I0:.2f} "
+          f"(R0={fit.beta / fit.gamma:.2f}), cost={fit.cost:.2f}, converged={fit.success}")
+    print(f"{calibration_starts} starts in {elapsed:.2f} s")
+
+    fig = plt.figure()
+    plt.bar(obs_days, cases, color='lightgray', label='Observed cases')
+    plt.plot(np.arange(len(fit.predicted)), fit.predicted, color='red', label='Fitted SIR incidence')
+    plt.xlabel("Days")
+    plt.ylabel("New cases per day")
+    plt.title("SIR calibration to case counts")
+    plt.legend()
+    plt.grid(True)
+    finish_figure(fig, "virus_spread_calibration")
+
+
+def run_metapopulation():
+    from sir_metapopulation import load_mobility, load_regions, simulate_metapopulation, synthetic_regions
+
+    if regions_csv:
+        regions = load_regions(regions_csv)
+        mobility = load_mobility(mobility_csv, regions.names)
+    else:
+        regions, mobility = synthetic_regions(synthetic_region_count, seed=RANDOM_SEED)
+
+    start = time.perf_counter()
+    result = simulate_metapopulation(regions, mobility, days, output_path=metapopulation_output)
+    elapsed = time.perf_counter() - start
+
+    total_population = regions.population.sum()
+    print("Virus Spread Simulation — Metapopulation SIR")
+    print(f"Regions: {len(regions.population):,}, mobility links: {mobility.nnz:,}, "
+          f"{days} days in {elapsed:.2f} s")
+    print(f"National peak infected: {result.I_total.max():,.0f} on day {int(result.I_total.argmax())}")
+    print(f"National attack rate: {result.final_size.sum() / total_population:.2%}")
+    print(f"Regional peak day: median {np.median(result.peak_day):.0f}, "
+          f"range {result.peak_day.min()}-{result.peak_day.max()}")
+    if metapopulation_output:
+        print(f"Regional time series written to {metapopulation_output}")
+
+    fig = plt.figure()
+    plt.plot(result.S_total, label='Susceptible', color='blue')
+    plt.plot(result.I_total, label='Infected', color='red')
+    plt.plot(result.R_total, label='Recovered', color='green')
+    plt.xlabel("Days")
+    plt.ylabel("Number of People")
+    plt.title(f"Metapopulation SIR ({len(regions.population):,} regions, totals)")
+    plt.legend()
+    plt.grid(True)
+    finish_figure(fig, "virus_spread_metapopulation")
+
+
+MODES = {
+    "deterministic": run_deterministic,
+    "ensemble": run_ensemble,
+    "stochastic": run_stochastic,
+    "network": run_network,
+    "ode": run_ode,
+    "calibrate": run_calibrate,
+    "metapopulation": run_metapopulation,
+}
+
+if __name__ == "__main__":
+    MODES[simulation_mode]()